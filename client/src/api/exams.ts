@@ -1,8 +1,11 @@
 import axios from 'axios';
-import type { Exam, AddExam, UpdateExam } from '@/types/exams';
+import type { Exam, AddExam, UpdateExam, FraudIncident, AddFraudIncident } from '@/types/exams';
 
 const API_BASE_URL = 'http://localhost:8000';
 
+export const blobUrl = (path?: string | null): string | undefined =>
+  path ? `${API_BASE_URL}${path}` : undefined;
+
 export const fetchExams = async (skip: number = 0, limit: number = 100, token?: string): Promise<Exam[]> => {
   const response = await axios.get(`${API_BASE_URL}/exams`, {
     params: { skip, limit },
@@ -56,4 +59,32 @@ export const deleteExam = async (examId: number, token?: string): Promise<void>
       'Authorization': `Bearer ${token}`
     }
   });
+};
+
+export const fetchIncidents = async (
+  examId: number,
+  skip: number = 0,
+  limit: number = 50,
+  token?: string
+): Promise<FraudIncident[]> => {
+  const response = await axios.get(`${API_BASE_URL}/exams/${examId}/incidents`, {
+    params: { skip, limit },
+    headers: {
+      'Authorization': `Bearer ${token}`
+    }
+  });
+  return response.data;
+};
+
+export const addIncident = async (
+  examId: number,
+  incident: AddFraudIncident,
+  token?: string
+): Promise<FraudIncident> => {
+  const response = await axios.post(`${API_BASE_URL}/exams/${examId}/incidents`, incident, {
+    headers: {
+      'Authorization': `Bearer ${token}`
+    }
+  });
+  return response.data;
 };
\ No newline at end of file
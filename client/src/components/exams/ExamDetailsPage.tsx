@@ -1,5 +1,6 @@
 import { useParams } from "react-router-dom";
-import { useExamsData, useUpdateExam } from "@/hooks/useExams";
+import { useAddIncident, useExamIncidents, useExamsData, useUpdateExam } from "@/hooks/useExams";
+import { blobUrl } from "@/api/exams";
 import { Button } from "@/components/ui/button";
 import { ArrowLeft, AlertCircle, FileText, Video, VideoOff, Check, X } from "lucide-react";
 import { useNavigate } from "react-router-dom";
@@ -10,46 +11,39 @@ import { Card, CardHeader, CardTitle, CardContent, CardDescription } from "@/com
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs";
 import FraudDetectionSession from "./FraudDetectionSession";
 import type { FraudEvidence } from "@/types/exams";
-import { useEffect, useState } from "react";
+import { useState } from "react";
 
 export const ExamDetailsPage = () => {
   const { examId } = useParams();
   const { data: exams = [], refetch } = useExamsData();
   const { mutate: updateExam } = useUpdateExam();
+  const { mutate: addIncident } = useAddIncident();
+  const {
+    data: incidentPages,
+    fetchNextPage,
+    hasNextPage,
+    isFetchingNextPage,
+  } = useExamIncidents(Number(examId));
   const navigate = useNavigate();
   const [isMonitoringActive, setIsMonitoringActive] = useState(false);
-  const [fraudEvidence, setFraudEvidence] = useState<FraudEvidence[]>([]);
 
   const exam = exams.find((e) => e.id === Number(examId));
+  const incidents = incidentPages?.pages.flat() ?? [];
 
-  useEffect(() => {
-    if (exam?.fraud_evidence?.length) {
-      setFraudEvidence((prev) => {
-        const existingIds = new Set(prev.map((ev) => ev.id));
-        const merged = [...prev];
-        exam.fraud_evidence?.forEach((ev) => {
-          if (!existingIds.has(ev.id)) merged.push(ev);
-        });
-        return merged;
-      });
-    }
-  }, [exam?.fraud_evidence]);
-
+  // Each incident is appended on its own; the server flags the exam as
+  // suspected on the first one
   const handleFraudDetected = (newEvidence: FraudEvidence) => {
-    setFraudEvidence(prev => {
-      const updatedEvidence = [...prev, newEvidence];
-
-      updateExam({
-        examId: Number(examId),
-        examData: {
-          fraud_status: "SUSPECTED",
-          fraud_evidence: updatedEvidence,
-        },
-      }, {
-        onSuccess: () => refetch()
-      });
-
-      return updatedEvidence;
+    addIncident({
+      examId: Number(examId),
+      incident: {
+        timestamp: newEvidence.timestamp,
+        screenshot: newEvidence.screenshot,
+        detections: newEvidence.detections,
+      },
+    }, {
+      onSuccess: () => {
+        if (!exam?.fraud_status) refetch();
+      }
     });
   };
 
@@ -180,10 +174,10 @@ export const ExamDetailsPage = () => {
             <TabsTrigger value="monitoring">Monitoring</TabsTrigger>
             <TabsTrigger
               value="evidence"
-              disabled={!exam.fraud_evidence?.length}
+              disabled={!incidents.length}
               className="data-[state=active]:bg-white data-[state=active]:shadow-sm"
             >
-              Evidence {exam.fraud_evidence?.length ? `(${exam.fraud_evidence.length})` : ''}
+              Evidence {incidents.length ? `(${incidents.length}${hasNextPage ? '+' : ''})` : ''}
             </TabsTrigger>
           </TabsList>
 
@@ -278,29 +272,32 @@ export const ExamDetailsPage = () => {
             </Card>
           </TabsContent>
 
-          <TabsContent key={exam.fraud_evidence?.length} value="evidence">
-            {exam.fraud_evidence?.length ? (
+          <TabsContent value="evidence">
+            {incidents.length ? (
               <Card className="shadow-sm">
                 <CardHeader>
                   <CardTitle className="text-lg">Fraud Evidence</CardTitle>
                   <CardDescription>
-                    {exam.fraud_evidence.length} incident(s) recorded
+                    {incidents.length}{hasNextPage ? '+' : ''} incident(s) recorded
                   </CardDescription>
                 </CardHeader>
                 <CardContent className="grid gap-4 md:grid-cols-2 lg:grid-cols-3">
-                  {exam.fraud_evidence.map((evidence, index) => (
-                    <div key={index} className="border rounded-lg p-4 space-y-3 bg-white shadow-sm">
+                  {incidents.map((evidence, index) => (
+                    <div key={evidence.id} className="border rounded-lg p-4 space-y-3 bg-white shadow-sm">
                       <div className="flex items-center gap-2 text-sm text-muted-foreground">
                         <FileText className="h-4 w-4" />
                         <span>
                           {format(new Date(evidence.timestamp), "PPpp")}
                         </span>
                       </div>
-                      <img
-                        src={evidence.screenshot}
-                        alt={`Evidence ${index + 1}`}
-                        className="rounded-md border w-full aspect-video object-cover shadow-inner"
-                      />
+                      <a href={blobUrl(evidence.screenshot_url)} target="_blank" rel="noreferrer">
+                        <img
+                          src={blobUrl(evidence.thumbnail_url ?? evidence.screenshot_url)}
+                          alt={`Evidence ${index + 1}`}
+                          loading="lazy"
+                          className="rounded-md border w-full aspect-video object-cover shadow-inner"
+                        />
+                      </a>
                       <div className="text-sm space-y-1">
                         <p className="font-medium text-foreground">Detections:</p>
                         <ul className="list-disc pl-5 space-y-1">
@@ -314,6 +311,17 @@ export const ExamDetailsPage = () => {
                     </div>
                   ))}
                 </CardContent>
+                {hasNextPage && (
+                  <div className="flex justify-center pb-6">
+                    <Button
+                      variant="outline"
+                      onClick={() => fetchNextPage()}
+                      disabled={isFetchingNextPage}
+                    >
+                      {isFetchingNextPage ? "Loading..." : "Load more"}
+                    </Button>
+                  </div>
+                )}
               </Card>
             ) : (
               <Alert className="border">
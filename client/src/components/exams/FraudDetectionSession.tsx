@@ -25,6 +25,8 @@ const FraudDetectionSession: React.FC<FraudDetectionSessionProps> = ({
   const [error, setError] = useState<string | null>(null);
   const intervalRef = useRef<NodeJS.Timeout | null>(null);
   const streamRef = useRef<MediaStream | null>(null);
+  // Lets the server skip inference on frames that haven't changed
+  const sessionIdRef = useRef<string>(crypto.randomUUID());
 
   // Sync internal state with parent's isActive state
   useEffect(() => {
@@ -92,17 +94,19 @@ const FraudDetectionSession: React.FC<FraudDetectionSessionProps> = ({
     if (!ctx) return;
 
     ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
-    const imageDataUrl = canvas.toDataURL("image/jpeg");
-    const base64Only = imageDataUrl.split(',')[1];
+    const frame = await new Promise<Blob | null>((resolve) =>
+      canvas.toBlob(resolve, "image/jpeg")
+    );
+    if (!frame) return;
 
     try {
-      const res = await fetch("http://localhost:8000/api/ai/detect/", {
+      const res = await fetch("http://localhost:8000/api/ai/detect/frame", {
         method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({
-          image_data: base64Only,
-          exam_id: "test123"
-        }),
+        headers: {
+          "Content-Type": "application/octet-stream",
+          "X-Session-Id": sessionIdRef.current,
+        },
+        body: frame,
       });
 
       const result = await res.json();
@@ -110,7 +114,7 @@ const FraudDetectionSession: React.FC<FraudDetectionSessionProps> = ({
         const evidence: FraudEvidence = {
           examId: exam.id,
           timestamp: new Date().toISOString(),
-          screenshot: imageDataUrl,
+          screenshot: canvas.toDataURL("image/jpeg"),
           detections: result.detections,
         };
         onFraudDetected(evidence);
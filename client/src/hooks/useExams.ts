@@ -1,4 +1,4 @@
-import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
+import { useQuery, useInfiniteQuery, useMutation, useQueryClient } from "@tanstack/react-query";
 import {
   fetchExams,
   fetchExamsByClass,
@@ -6,8 +6,10 @@ import {
   createExam as apiCreateExam,
   updateExam as apiUpdateExam,
   deleteExam as apiDeleteExam,
+  fetchIncidents,
+  addIncident as apiAddIncident,
 } from "@/api/exams";
-import type { Exam, AddExam, UpdateExam } from "@/types/exams";
+import type { Exam, AddExam, UpdateExam, FraudIncident, AddFraudIncident } from "@/types/exams";
 import { useAuth } from "@/context/AuthContext";
 
 export const useExamsData = (classId?: number, skip: number = 0, limit: number = 100) => {
@@ -65,4 +67,30 @@ export const useDeleteExam = () => {
       queryClient.removeQueries({ queryKey: ["exams", examId] });
     },
   });
+};
+
+const INCIDENTS_PAGE_SIZE = 50;
+
+export const useExamIncidents = (examId: number) => {
+  const { user } = useAuth();
+  return useInfiniteQuery({
+    queryKey: ["exams", examId, "incidents"],
+    queryFn: ({ pageParam }) =>
+      fetchIncidents(examId, pageParam, INCIDENTS_PAGE_SIZE, user?.token),
+    initialPageParam: 0,
+    getNextPageParam: (lastPage: FraudIncident[], allPages: FraudIncident[][]) =>
+      lastPage.length < INCIDENTS_PAGE_SIZE ? undefined : allPages.length * INCIDENTS_PAGE_SIZE,
+    enabled: !!examId,
+  });
+};
+
+export const useAddIncident = () => {
+  const { user } = useAuth();
+  const queryClient = useQueryClient();
+  return useMutation<FraudIncident, Error, { examId: number; incident: AddFraudIncident }>({
+    mutationFn: ({ examId, incident }) => apiAddIncident(examId, incident, user?.token),
+    onSuccess: (data) => {
+      queryClient.invalidateQueries({ queryKey: ["exams", data.exam_id, "incidents"] });
+    },
+  });
 };
\ No newline at end of file
@@ -24,6 +24,24 @@ export interface FraudEvidence {
   }>;
 }
 
+export interface FraudIncident {
+  id: number;
+  exam_id: number;
+  student_id?: number | null;
+  timestamp: string;
+  screenshot_url?: string | null;
+  thumbnail_url?: string | null;
+  detections: FraudEvidence["detections"];
+  created_at: string;
+}
+
+export interface AddFraudIncident {
+  timestamp: string;
+  screenshot?: string | null;
+  student_id?: number | null;
+  detections: FraudEvidence["detections"];
+}
+
 export interface Exam {
   id: number;
   name: string;
@@ -36,6 +54,9 @@ export interface Exam {
   created_at: string;
   updated_at?: string;
   class_info: ClassInfo;
+  // Only on list responses, which leave out fraud_evidence
+  incident_count?: number;
+  latest_incident_at?: string | null;
 }
 
 export interface AddExam {
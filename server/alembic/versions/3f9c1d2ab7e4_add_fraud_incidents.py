@@ -0,0 +1,74 @@
+"""add fraud incidents
+
+Revision ID: 3f9c1d2ab7e4
+Revises: 98cb2751d87f
+Create Date: 2026-10-18 20:40:00.000000
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c1d2ab7e4'
+down_revision: Union[str, None] = '98cb2751d87f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _parse_timestamp(value) -> datetime:
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return datetime.now(timezone.utc)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    incidents = op.create_table(
+        'fraud_incidents',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('exam_id', sa.Integer(), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=True),
+        sa.Column('timestamp', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('screenshot', sa.Text(), nullable=True),
+        sa.Column('detections', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['exam_id'], ['exams.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['student_id'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_fraud_incidents_id'), 'fraud_incidents', ['id'], unique=False)
+    op.create_index(
+        'ix_fraud_incident_exam_timestamp',
+        'fraud_incidents',
+        ['exam_id', 'timestamp', 'student_id'],
+        unique=False,
+    )
+
+    # Move evidence already stored on exams into the new table
+    exams = sa.table('exams', sa.column('id', sa.Integer), sa.column('fraud_evidence', sa.JSON))
+    connection = op.get_bind()
+    rows = []
+    for exam_id, evidence in connection.execute(
+        sa.select(exams.c.id, exams.c.fraud_evidence).where(exams.c.fraud_evidence.isnot(None))
+    ):
+        for item in evidence or []:
+            rows.append({
+                'exam_id': exam_id,
+                'timestamp': _parse_timestamp(item.get('timestamp')),
+                'screenshot': item.get('screenshot'),
+                'detections': item.get('detections') or [],
+            })
+    if rows:
+        op.bulk_insert(incidents, rows)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_fraud_incident_exam_timestamp', table_name='fraud_incidents')
+    op.drop_index(op.f('ix_fraud_incidents_id'), table_name='fraud_incidents')
+    op.drop_table('fraud_incidents')
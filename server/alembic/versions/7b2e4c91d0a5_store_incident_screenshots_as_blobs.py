@@ -0,0 +1,94 @@
+"""store incident screenshots as blobs
+
+Revision ID: 7b2e4c91d0a5
+Revises: 3f9c1d2ab7e4
+Create Date: 2026-10-18 21:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b2e4c91d0a5'
+down_revision: Union[str, None] = '3f9c1d2ab7e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    from app.core.storage import blob_key, decode_data_url, save_screenshot
+
+    op.add_column('fraud_incidents', sa.Column('screenshot_hash', sa.String(length=64), nullable=True))
+    op.add_column('fraud_incidents', sa.Column('thumbnail_hash', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_fraud_incidents_screenshot_hash'), 'fraud_incidents', ['screenshot_hash'], unique=False)
+
+    # Move inline base64 screenshots into the blob store, one row at a time
+    incidents = sa.table(
+        'fraud_incidents',
+        sa.column('id', sa.Integer),
+        sa.column('screenshot', sa.Text),
+        sa.column('screenshot_hash', sa.String),
+        sa.column('thumbnail_hash', sa.String),
+    )
+    connection = op.get_bind()
+    stored = set()
+    ids = connection.execute(
+        sa.select(incidents.c.id).where(incidents.c.screenshot.isnot(None))
+    ).scalars().all()
+    for incident_id in ids:
+        screenshot = connection.execute(
+            sa.select(incidents.c.screenshot).where(incidents.c.id == incident_id)
+        ).scalar()
+        try:
+            screenshot_hash, thumbnail_hash = save_screenshot(decode_data_url(screenshot))
+        except ValueError:
+            continue
+        stored.add(screenshot_hash)
+        connection.execute(
+            incidents.update()
+            .where(incidents.c.id == incident_id)
+            .values(screenshot_hash=screenshot_hash, thumbnail_hash=thumbnail_hash)
+        )
+
+    op.drop_column('fraud_incidents', 'screenshot')
+
+    # The legacy exams.fraud_evidence copies were moved to fraud_incidents
+    # (and so to the blob store) by 3f9c1d2ab7e4; keep only their blob keys
+    exams = sa.table('exams', sa.column('id', sa.Integer), sa.column('fraud_evidence', sa.JSON))
+    exam_ids = connection.execute(
+        sa.select(exams.c.id).where(exams.c.fraud_evidence.isnot(None))
+    ).scalars().all()
+    for exam_id in exam_ids:
+        evidence = connection.execute(
+            sa.select(exams.c.fraud_evidence).where(exams.c.id == exam_id)
+        ).scalar()
+        if not any(isinstance(item, dict) and item.get('screenshot') for item in evidence or []):
+            continue
+        stripped = []
+        for item in evidence:
+            item = dict(item)
+            screenshot = item.pop('screenshot', None)
+            try:
+                key = blob_key(decode_data_url(screenshot)) if screenshot else None
+            except ValueError:
+                key = None  # Undecodable: dropped, as from fraud_incidents above
+            if key in stored:
+                item['screenshot_hash'] = key
+            stripped.append(item)
+        connection.execute(
+            exams.update().where(exams.c.id == exam_id).values(fraud_evidence=stripped)
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Screenshots stay in the blob store; rows only lose their references,
+    # and exams.fraud_evidence keeps its screenshot_hash entries
+    op.add_column('fraud_incidents', sa.Column('screenshot', sa.Text(), nullable=True))
+    op.drop_index(op.f('ix_fraud_incidents_screenshot_hash'), table_name='fraud_incidents')
+    op.drop_column('fraud_incidents', 'thumbnail_hash')
+    op.drop_column('fraud_incidents', 'screenshot_hash')
@@ -0,0 +1,51 @@
+"""add keyset pagination indexes
+
+Revision ID: c41d8e6f2b93
+Revises: 7b2e4c91d0a5
+Create Date: 2026-10-18 21:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d8e6f2b93'
+down_revision: Union[str, None] = '7b2e4c91d0a5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing users get the migration time as their creation time
+    op.add_column(
+        'users',
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    )
+
+    op.create_index('ix_user_created_id', 'users', ['created_at', 'id'], unique=False)
+    op.create_index('ix_user_role_created_id', 'users', ['role_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_class_created_id', 'classes', ['created_at', 'id'], unique=False)
+    op.create_index('ix_user_class_class_user', 'user_class_associations', ['class_id', 'user_id'], unique=False)
+    op.create_index('ix_exam_created_id', 'exams', ['created_at', 'id'], unique=False)
+    op.create_index('ix_exam_class_created_id', 'exams', ['class_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_exam_status_created_id', 'exams', ['status', 'created_at', 'id'], unique=False)
+    op.create_index('ix_exam_fraud_status_created_id', 'exams', ['fraud_status', 'created_at', 'id'], unique=False)
+    op.create_index('ix_exam_exam_date', 'exams', ['exam_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_exam_exam_date', table_name='exams')
+    op.drop_index('ix_exam_fraud_status_created_id', table_name='exams')
+    op.drop_index('ix_exam_status_created_id', table_name='exams')
+    op.drop_index('ix_exam_class_created_id', table_name='exams')
+    op.drop_index('ix_exam_created_id', table_name='exams')
+    op.drop_index('ix_user_class_class_user', table_name='user_class_associations')
+    op.drop_index('ix_class_created_id', table_name='classes')
+    op.drop_index('ix_user_role_created_id', table_name='users')
+    op.drop_index('ix_user_created_id', table_name='users')
+    op.drop_column('users', 'created_at')
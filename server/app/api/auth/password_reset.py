@@ -58,10 +58,27 @@ def mark_token_as_used(db: Session, token: str) -> None:
     ).update({"is_used": True})
     db.commit()
 
-def cleanup_expired_tokens(db: Session) -> int:
-    """Clean up expired tokens and return count deleted"""
-    result = db.query(PasswordResetToken).filter(
-        PasswordResetToken.expires_at < datetime.utcnow()
-    ).delete()
-    db.commit()
-    return result
\ No newline at end of file
+def cleanup_expired_tokens(db: Session, batch_size: int = 1000, max_batches: int = 100) -> int:
+    """Delete expired tokens in bounded batches and return count deleted.
+
+    Each batch is its own short transaction, so a large backlog never holds
+    locks for long; whatever is left after `max_batches` waits for the next run.
+    """
+    cutoff = datetime.utcnow()
+    deleted = 0
+    for _ in range(max_batches):
+        ids = [
+            token_id for (token_id,) in db.query(PasswordResetToken.id).filter(
+                PasswordResetToken.expires_at < cutoff
+            ).limit(batch_size)
+        ]
+        if not ids:
+            break
+        db.query(PasswordResetToken).filter(
+            PasswordResetToken.id.in_(ids)
+        ).delete(synchronize_session=False)
+        db.commit()
+        deleted += len(ids)
+        if len(ids) < batch_size:
+            break
+    return deleted
\ No newline at end of file
@@ -0,0 +1,194 @@
+import logging
+import select
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.metrics import PRINCIPAL_CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "principal_invalidations"
+INVALIDATION_BATCH = 500  # User ids per NOTIFY; payloads are capped at 8000 bytes
+
+
+@dataclass(frozen=True)
+class Principal:
+    """What the auth dependencies hand to routes: detached, no lazy loads"""
+    id: int
+    email: str
+    role_id: int
+    class_ids: Tuple[int, ...] = ()
+
+
+def load_principal(db: Session, email: str) -> Optional[Principal]:
+    """Load the principal for a token subject in one round trip"""
+    # Imported here: the classes package imports this module through its
+    # routes and services
+    from app.api.classes.models import UserClassAssociation
+    from app.api.users.models import User
+
+    # users.email is unique, so every row belongs to the same user
+    rows = db.query(
+        User.id, User.email, User.role_id, UserClassAssociation.class_id
+    ).outerjoin(
+        UserClassAssociation, UserClassAssociation.user_id == User.id
+    ).filter(User.email == email).all()
+    if not rows:
+        return None
+    user_id, user_email, role_id, _ = rows[0]
+    return Principal(
+        id=user_id,
+        email=user_email,
+        role_id=role_id,
+        class_ids=tuple(sorted(class_id for *_, class_id in rows if class_id is not None))
+    )
+
+
+class PrincipalCache:
+    """Short-TTL principal cache keyed by token subject.
+
+    The users and classes services invalidate entries when a role or class
+    membership changes; PrincipalInvalidations carries that to the caches
+    of the other workers.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Tuple[float, Principal]] = {}
+        self._subjects: Dict[int, str] = {}  # user id -> subject, for invalidation
+        self._lock = threading.Lock()
+
+    def get(self, subject: str) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is not None and entry[0] > time.monotonic():
+                PRINCIPAL_CACHE_REQUESTS.labels("hit").inc()
+                return entry[1]
+        PRINCIPAL_CACHE_REQUESTS.labels("miss").inc()
+        return None
+
+    def put(self, subject: str, principal: Principal) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[subject] = (time.monotonic() + self.ttl_seconds, principal)
+            self._subjects[principal.id] = subject
+
+    def invalidate(self, user_ids: Iterable[int]) -> None:
+        with self._lock:
+            for user_id in user_ids:
+                subject = self._subjects.pop(user_id, None)
+                if subject is not None:
+                    self._entries.pop(subject, None)
+
+    def purge_expired(self) -> int:
+        """Drop expired entries; returns how many were dropped"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [subject for subject, (expires, _) in self._entries.items() if expires <= now]
+            for subject in expired:
+                _, principal = self._entries.pop(subject)
+                if self._subjects.get(principal.id) == subject:
+                    del self._subjects[principal.id]
+        return len(expired)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._subjects.clear()
+
+
+class PrincipalInvalidations:
+    """Shares cache invalidations between workers over PostgreSQL LISTEN/NOTIFY.
+
+    Each worker listens on a dedicated connection outside the pool and
+    drops the ids other workers publish. Notifications sent while a
+    listener is disconnected are lost, so it clears the whole cache each
+    time it (re)connects.
+    """
+
+    def __init__(self, cache: PrincipalCache, reconnect_seconds: float = 5):
+        self.cache = cache
+        self.reconnect_seconds = reconnect_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None or engine.dialect.name != "postgresql" or self.cache.ttl_seconds <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="principal-invalidations", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=2)
+        self._thread = None
+
+    def publish(self, user_ids: List[int]) -> None:
+        """Tell every worker, this one included, to drop `user_ids`"""
+        if self._thread is None or not user_ids:
+            return
+        try:
+            with engine.begin() as connection:
+                for start in range(0, len(user_ids), INVALIDATION_BATCH):
+                    connection.execute(
+                        text("SELECT pg_notify(:channel, :payload)"),
+                        {
+                            "channel": INVALIDATION_CHANNEL,
+                            "payload": ",".join(map(str, user_ids[start:start + INVALIDATION_BATCH]))
+                        }
+                    )
+        except SQLAlchemyError as e:
+            # The change itself is committed; other workers catch up when
+            # their entries expire
+            logger.warning("Could not publish principal invalidations: %s", e)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except Exception as e:
+                logger.warning(
+                    "Principal invalidation listener disconnected, retrying in %ss: %s",
+                    self.reconnect_seconds, e
+                )
+            self.cache.clear()
+            self._stop.wait(self.reconnect_seconds)
+
+    def _listen(self) -> None:
+        import psycopg2
+
+        connection = psycopg2.connect(settings.DATABASE_URL, connect_timeout=5)
+        try:
+            connection.autocommit = True
+            connection.cursor().execute(f"LISTEN {INVALIDATION_CHANNEL}")
+            self.cache.clear()
+            while not self._stop.is_set():
+                if not select.select([connection], [], [], 1)[0]:
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    payload = connection.notifies.pop(0).payload
+                    self.cache.invalidate(int(user_id) for user_id in payload.split(",") if user_id)
+        finally:
+            connection.close()
+
+
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_TTL_SECONDS)
+principal_invalidations = PrincipalInvalidations(principal_cache)
+
+
+def invalidate_principals(*user_ids: int) -> None:
+    principal_cache.invalidate(user_ids)
+    principal_invalidations.publish(list(user_ids))
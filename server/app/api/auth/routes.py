@@ -2,21 +2,20 @@ from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.api.users.models import User
+from app.core.database import get_db_session, run_db
 from .password_reset import (
     create_password_reset_token,
     verify_password_reset_token,
     mark_token_as_used,
-    cleanup_expired_tokens
 )
 from .schemas import Token, PasswordResetRequest, PasswordResetConfirm
 from .services import (
     authenticate_user,
     create_access_token,
-    get_password_hash,
+    get_user_by_email,
 )
 from app.core.config import settings
+from app.core.security import PasswordHasherBusy, get_password_hash_async
 from app.core.email import send_reset_password_email
 from fastapi_limiter.depends import RateLimiter
 
@@ -25,9 +24,16 @@ router = APIRouter(prefix="/auth", tags=["authentication"])
 @router.post("/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db_session)
 ):
-    user = authenticate_user(db, form_data.username, form_data.password)
+    try:
+        user = await authenticate_user(db, form_data.username, form_data.password)
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many logins in progress, retry shortly",
+            headers={"Retry-After": "1"},
+        )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -54,16 +60,13 @@ async def login(
 )
 async def forgot_password(
     request: PasswordResetRequest,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db_session)
 ):
-    cleanup_expired_tokens(db)  
-    
-    user = db.query(User).filter(
-        User.email == request.email,
-    ).first()
+    # Expired tokens are deleted by the maintenance scheduler
+    user = await run_db(db, get_user_by_email, request.email)
     
     if user:
-        token = create_password_reset_token(db, user.id)
+        token = await run_db(db, create_password_reset_token, user.id)
         send_reset_password_email(user.email, token)
     
     return {"message": "If the email exists, you'll receive a reset link"}
@@ -71,18 +74,25 @@ async def forgot_password(
 @router.post("/reset-password")
 async def reset_password(
     request: PasswordResetConfirm,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db_session)
 ):
     
-    user = verify_password_reset_token(db, request.token)
+    user = await run_db(db, verify_password_reset_token, request.token)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid or expired token"
         )
     
-    user.password_hash = get_password_hash(request.new_password)
-    mark_token_as_used(db, request.token)
-    db.commit()
+    try:
+        user.password_hash = await get_password_hash_async(request.new_password)
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many password changes in progress, retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    # Commits the new hash together with the used flag
+    await run_db(db, mark_token_as_used, request.token)
     
     return {"message": "Password updated successfully"}
\ No newline at end of file
@@ -3,32 +3,30 @@ from typing import Annotated
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import run_db, run_in_session
 from app.api.users.models import User
+from .principals import Principal, load_principal, principal_cache
 from .schemas import TokenData
 from app.core.config import settings
+from app.core.security import verify_password_async
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-def verify_password(plain_password: str, hashed_password: str):
-    return pwd_context.verify(plain_password, hashed_password)
+def get_user_by_email(db: Session, email: str):
+    return db.query(User).filter(User.email == email).first()
 
-def get_password_hash(password: str):
-    return pwd_context.hash(password)
-
-def authenticate_user(db: Session, email: str, password: str):
-    user = db.query(User).filter(User.email == email).first()
+async def authenticate_user(db: Session, email: str, password: str):
+    user = await run_db(db, get_user_by_email, email)
     if not user:
         return False
     
     if user.role_id == 1 and not user.password_hash:
         return user
         
-    if not verify_password(password, user.password_hash):
+    # bcrypt runs on the bounded hash pool, not on the event loop
+    if not await verify_password_async(password, user.password_hash):
         return False
         
     return user
@@ -42,7 +40,7 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
-async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: Annotated[Session, Depends(get_db)]):
+async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -57,13 +55,18 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: An
     except JWTError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.email == token_data.email).first()
-    if user is None:
-        raise credentials_exception
-    return user
+    principal = principal_cache.get(token_data.email)
+    if principal is None:
+        # Only misses touch the database, and they read the primary: a
+        # lagging replica could hand back a role that was just revoked
+        principal = await run_in_session(load_principal, token_data.email)
+        if principal is None:
+            raise credentials_exception
+        principal_cache.put(token_data.email, principal)
+    return principal
 
 async def get_current_admin(
-    current_user: Annotated[User, Depends(get_current_user)]
+    current_user: Annotated[Principal, Depends(get_current_user)]
 ):
     if current_user.role_id != 3:  # Only admin
         raise HTTPException(
@@ -73,7 +76,7 @@ async def get_current_admin(
     return current_user
 
 async def get_current_supervisor(
-    current_user: Annotated[User, Depends(get_current_user)]
+    current_user: Annotated[Principal, Depends(get_current_user)]
 ):
     if current_user.role_id not in [2, 3]:  # Supervisor or admin
         raise HTTPException(
@@ -0,0 +1,60 @@
+import time
+from itertools import chain
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from app.core.storage import (
+    BLOB_KEY_PATTERN,
+    BlobNotFound,
+    get_blob_store,
+    sniff_content_type,
+    verify_blob_signature,
+)
+
+router = APIRouter(prefix="/blobs", tags=["blobs"])
+
+@router.get("/{key}")
+def get_blob(key: str, request: Request, expires: int = 0, signature: str = ""):
+    """Stream a stored blob through a signed URL.
+
+    <img> tags cannot send an auth header, so access is granted by the
+    short-lived URLs that GET /exams/{exam_id}/incidents hands out after
+    its own access check; a bare content hash is not enough.
+    """
+    if not BLOB_KEY_PATTERN.match(key):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Blob not found"
+        )
+    if not verify_blob_signature(key, expires, signature):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid or expired blob URL"
+        )
+
+    etag = f'"{key}"'
+    headers = {
+        # Student evidence: never in shared proxies or CDNs, and not kept
+        # by the browser past the URL's own expiry
+        "Cache-Control": f"private, max-age={max(0, expires - int(time.time()))}, immutable",
+        "ETag": etag,
+        # The content type is sniffed from uploaded bytes; browsers must not guess another
+        "X-Content-Type-Options": "nosniff",
+    }
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in if_none_match or if_none_match.strip() == "*":
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    try:
+        chunks = get_blob_store().open(key)
+        first = next(chunks, b"")
+    except BlobNotFound:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Blob not found"
+        )
+
+    return StreamingResponse(
+        chain([first], chunks),
+        media_type=sniff_content_type(first[:16]),
+        headers=headers
+    )
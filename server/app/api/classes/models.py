@@ -22,6 +22,10 @@ class Class(Base):
     )
     exams = relationship("Exam", back_populates="class_", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index('ix_class_created_id', 'created_at', 'id'),
+    )
+
 class UserClassAssociation(Base):
     __tablename__ = "user_class_associations"
     
@@ -37,4 +41,6 @@ class UserClassAssociation(Base):
     
     __table_args__ = (
         Index('ix_user_class_unique', 'user_id', 'class_id', unique=True),
+        # EXISTS lookups by class (supervisor scoping, class filter on users)
+        Index('ix_user_class_class_user', 'class_id', 'user_id'),
     )
\ No newline at end of file
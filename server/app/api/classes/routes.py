@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from .schemas import ClassResponse, ClassCreate, ClassUpdate, ClassWithUsersResponse
 from .services import ClassService
-from app.core.database import get_db
+from app.core.database import get_db, get_db_session, render, run_db
+from app.core.replicas import get_read_db_session
+from app.core.pagination import set_next_cursor
 from app.api.auth.services import get_current_admin, get_current_supervisor, get_current_user
-from app.api.users.models import User
+from app.api.auth.principals import Principal
 
 router = APIRouter(prefix="/classes", tags=["classes"])
 
@@ -13,39 +16,64 @@ router = APIRouter(prefix="/classes", tags=["classes"])
 def create_class(
     class_data: ClassCreate, 
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)  
+    current_user: Principal = Depends(get_current_admin)  
 ):
     return ClassService.create_class(db, class_data)
 
 @router.get("/", response_model=List[ClassResponse])
-def read_classes(
-    skip: int = 0, 
-    limit: int = 100, 
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_supervisor)  
+async def read_classes(
+    skip: int = Query(0, ge=0), 
+    limit: int = Query(100, ge=1, le=500), 
+    cursor: Optional[str] = None,
+    year: Optional[int] = None,
+    is_active: Optional[bool] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    db: Session = Depends(get_db_session),
+    current_user: Principal = Depends(get_current_supervisor)  
 ):
-    return ClassService.get_classes(db, user=current_user, skip=skip, limit=limit)
+    def load(session: Session):
+        classes, next_cursor = ClassService.get_classes(
+            session,
+            user=current_user,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            year=year,
+            is_active=is_active,
+            created_from=created_from,
+            created_to=created_to
+        )
+        return render(List[ClassResponse], classes), next_cursor
+
+    response, next_cursor = await run_db(db, load)
+    set_next_cursor(response, next_cursor)
+    return response
 
 @router.get("/{class_id}", response_model=ClassResponse)
-def read_class(
+async def read_class(
     class_id: int, 
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_supervisor)  
+    db: Session = Depends(get_read_db_session),
+    current_user: Principal = Depends(get_current_supervisor)  
 ):
-    db_class = ClassService.get_class(db, class_id=class_id, user=current_user)
-    if not db_class:
+    def load(session: Session):
+        db_class = ClassService.get_class(session, class_id=class_id, user=current_user)
+        return render(ClassResponse, db_class) if db_class else None
+
+    response = await run_db(db, load)
+    if response is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Class not found or access denied"
         )
-    return db_class
+    return response
 
 @router.put("/{class_id}", response_model=ClassResponse)
 def update_class(
     class_id: int,
     class_data: ClassUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin) 
+    current_user: Principal = Depends(get_current_admin) 
 ):
     db_class = ClassService.update_class(db, class_id=class_id, class_data=class_data)
     if not db_class:
@@ -59,7 +87,7 @@ def update_class(
 def delete_class(
     class_id: int, 
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)  
+    current_user: Principal = Depends(get_current_admin)  
 ):
     success = ClassService.delete_class(db, class_id=class_id)
     if not success:
@@ -69,18 +97,22 @@ def delete_class(
         )
 
 @router.get("/{class_id}/users", response_model=ClassWithUsersResponse)
-def get_class_with_users(
+async def get_class_with_users(
     class_id: int, 
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_supervisor)  
+    db: Session = Depends(get_db_session),
+    current_user: Principal = Depends(get_current_supervisor)  
 ):
-    db_class = ClassService.get_class(db, class_id=class_id, user=current_user)
-    if not db_class:
+    def load(session: Session):
+        db_class = ClassService.get_class(session, class_id=class_id, user=current_user)
+        return render(ClassWithUsersResponse, db_class) if db_class else None
+
+    response = await run_db(db, load)
+    if response is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Class not found or access denied"
         )
-    return db_class
+    return response
 
 @router.post("/{class_id}/users/{user_id}", status_code=status.HTTP_201_CREATED)
 def add_user_to_class(
@@ -88,7 +120,7 @@ def add_user_to_class(
     user_id: int,
     is_professor: bool = False,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin) 
+    current_user: Principal = Depends(get_current_admin) 
 ):
     return ClassService.add_user_to_class(
         db,
@@ -102,7 +134,7 @@ def remove_user_from_class(
     class_id: int,
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)  
+    current_user: Principal = Depends(get_current_admin)  
 ):
     success = ClassService.remove_user_from_class(
         db,
@@ -1,35 +1,74 @@
-from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional
+from datetime import datetime
+from sqlalchemy import exists
+from sqlalchemy.orm import Session, selectinload
+from typing import Dict, List, Optional, Tuple
+from app.api.auth.principals import Principal, invalidate_principals
+from app.core.database import dialect_insert
+from app.core.pagination import paginate
 from ..users.models import User
 from .models import Class, UserClassAssociation
 from .schemas import ClassCreate, ClassResponse, ClassUpdate
 
 class ClassService:
     @staticmethod
-    def get_classes(db: Session, user: Optional[User] = None, skip: int = 0, limit: int = 100) -> List[ClassResponse]:
+    def get_classes(
+        db: Session,
+        user: Optional[Principal] = None,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        year: Optional[int] = None,
+        is_active: Optional[bool] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None
+    ) -> Tuple[List[ClassResponse], Optional[str]]:
+        # selectinload: one extra query for all members of the page's classes,
+        # instead of repeating every class row once per member
         query = db.query(Class).options(
-            joinedload(Class.users).joinedload(UserClassAssociation.user)
+            selectinload(Class.users).joinedload(UserClassAssociation.user)
         )
+
+        if year is not None:
+            query = query.filter(Class.year == year)
+        if is_active is not None:
+            query = query.filter(Class.is_active == is_active)
+        if created_from is not None:
+            query = query.filter(Class.created_at >= created_from)
+        if created_to is not None:
+            query = query.filter(Class.created_at < created_to)
         
         # If user is supervisor (not admin), filter classes they're assigned to
         if user and user.role_id == 2:
-            query = query.join(Class.users).filter(
-                UserClassAssociation.user_id == user.id
+            query = query.filter(
+                exists().where(
+                    UserClassAssociation.class_id == Class.id,
+                    UserClassAssociation.user_id == user.id
+                )
             )
             
-        db_classes = query.offset(skip).limit(limit).all()
-        return [ClassResponse.from_orm_with_users(c) for c in db_classes]
+        db_classes, next_cursor = paginate(
+            query,
+            (Class.created_at, Class.id),
+            key=lambda c: (c.created_at, c.id),
+            limit=limit,
+            cursor=cursor,
+            skip=skip
+        )
+        return [ClassResponse.from_orm_with_users(c) for c in db_classes], next_cursor
 
     @staticmethod
-    def get_class(db: Session, class_id: int, user: Optional[User] = None) -> Optional[ClassResponse]:
+    def get_class(db: Session, class_id: int, user: Optional[Principal] = None) -> Optional[ClassResponse]:
         query = db.query(Class).options(
-            joinedload(Class.users).joinedload(UserClassAssociation.user)
+            selectinload(Class.users).joinedload(UserClassAssociation.user)
         ).filter(Class.id == class_id)
         
         # If user is supervisor (not admin), verify they're assigned to this class
         if user and user.role_id == 2:
-            query = query.join(Class.users).filter(
-                UserClassAssociation.user_id == user.id
+            query = query.filter(
+                exists().where(
+                    UserClassAssociation.class_id == Class.id,
+                    UserClassAssociation.user_id == user.id
+                )
             )
             
         db_class = query.first()
@@ -37,18 +76,6 @@ class ClassService:
             return ClassResponse.from_orm_with_users(db_class)
         return None
 
-    @staticmethod
-    def get_class(db: Session, class_id: int, current_user: User) -> Optional[ClassResponse]:
-        query = db.query(Class).options(joinedload(Class.users).joinedload(UserClassAssociation.user)).filter(Class.id == class_id)
-
-        if current_user.role_id == 2:
-            query = query.join(UserClassAssociation).filter(UserClassAssociation.user_id == current_user.id)
-
-        db_class = query.first()
-        if db_class:
-            return ClassResponse.from_orm_with_users(db_class)
-        return None
-
     @staticmethod
     def create_class(db: Session, class_data: ClassCreate) -> Class:
         db_class = Class(**class_data.model_dump())
@@ -76,8 +103,14 @@ class ClassService:
     def delete_class(db: Session, class_id: int) -> bool:
         db_class = db.query(Class).filter(Class.id == class_id).first()
         if db_class:
+            member_ids = [
+                user_id for (user_id,) in db.query(UserClassAssociation.user_id).filter(
+                    UserClassAssociation.class_id == class_id
+                )
+            ]
             db.delete(db_class)
             db.commit()
+            invalidate_principals(*member_ids)
             return True
         return False
 
@@ -95,9 +128,61 @@ class ClassService:
         )
         db.add(association)
         db.commit()
+        invalidate_principals(user_id)
         db.refresh(association)
         return association
 
+    @staticmethod
+    def bulk_add_users_to_class(
+        db: Session,
+        class_id: int,
+        user_ids: List[int]
+    ) -> Dict[int, str]:
+        """Assign many users to a class in one transaction.
+
+        Returns each requested id's outcome: assigned, already_assigned,
+        not_found or student_has_class (students may only be in one class).
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        results = {user_id: "not_found" for user_id in user_ids}
+        if not user_ids:
+            return results
+
+        roles = dict(
+            db.query(User.id, User.role_id).filter(User.id.in_(user_ids)).all()
+        )
+        current_classes: Dict[int, List[int]] = {}
+        for user_id, assigned_class_id in db.query(
+            UserClassAssociation.user_id, UserClassAssociation.class_id
+        ).filter(UserClassAssociation.user_id.in_(list(roles))):
+            current_classes.setdefault(user_id, []).append(assigned_class_id)
+
+        candidates = []
+        for user_id, role_id in roles.items():
+            assigned = current_classes.get(user_id, [])
+            if class_id in assigned:
+                results[user_id] = "already_assigned"
+            elif role_id == 1 and assigned:
+                results[user_id] = "student_has_class"
+            else:
+                candidates.append(user_id)
+
+        if candidates:
+            statement = dialect_insert(db)(UserClassAssociation).values([
+                {"user_id": user_id, "class_id": class_id, "is_professor": False}
+                for user_id in candidates
+            ]).on_conflict_do_nothing(
+                index_elements=["user_id", "class_id"]
+            ).returning(UserClassAssociation.user_id)
+            inserted = set(db.execute(statement).scalars())
+            for user_id in candidates:
+                # Lost a race with a concurrent assignment of the same pair
+                results[user_id] = "assigned" if user_id in inserted else "already_assigned"
+
+        db.commit()
+        invalidate_principals(*(user_id for user_id, result in results.items() if result == "assigned"))
+        return results
+
     @staticmethod
     def remove_user_from_class(db: Session, class_id: int, user_id: int) -> bool:
         association = db.query(UserClassAssociation).filter(
@@ -107,5 +192,6 @@ class ClassService:
         if association:
             db.delete(association)
             db.commit()
+            invalidate_principals(user_id)
             return True
         return False
\ No newline at end of file
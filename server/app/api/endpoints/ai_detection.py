@@ -1,28 +1,44 @@
-from fastapi import APIRouter, HTTPException
-from app.core.detection.fraud_detector import FraudDetector
+import asyncio
+import json
+import logging
+from fastapi import APIRouter, HTTPException, Request, WebSocket, WebSocketDisconnect, status
+from app.api.auth.principals import Principal
+from app.api.auth.services import get_current_supervisor, get_current_user
+from app.api.exams.services import ExamService
+from app.core.config import settings
+from app.core.database import run_in_session
+from app.core.detection.batching import detection_batcher
+from app.core.detection.executor import InferenceQueueFull
+from app.core.detection.gating import gate_registry, new_gate
+from app.core.detection.session import DetectionSession
 from ...schemas.detection import DetectionResult
-from typing import Dict
+from typing import Dict, Optional, Union
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
-detector = FraudDetector()
 
-@router.post("/detect", response_model=DetectionResult)
-async def detect_fraud(data: Dict[str, str]):
+async def _run_detection(
+    image_data: Union[str, bytes],
+    session_id: Optional[str] = None
+) -> DetectionResult:
     try:
-        if not data.get("image_data"):
-            return DetectionResult(
-                detections=[],
-                is_fraud=False,
-                timestamp=datetime.now().isoformat(),
-                error="image_data is required"
-            )
-
-        result = detector.process_image(data["image_data"])
+        if session_id and settings.DETECTION_GATE_ENABLED:
+            gate = gate_registry.get(session_id)
+            result = await gate.detect(image_data, detection_batcher.submit)
+        else:
+            result = await detection_batcher.submit(image_data)
 
         # Ensure `result` is an instance of DetectionResult or dict that matches
         return DetectionResult(**result)
 
+    except InferenceQueueFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Detection service is busy, retry shortly",
+            headers={"Retry-After": "1"},
+        )
     except Exception as e:
         return DetectionResult(
             detections=[],
@@ -31,3 +47,164 @@ async def detect_fraud(data: Dict[str, str]):
             error=f"Processing error: {str(e)}"
         )
 
+@router.post("/detect", response_model=DetectionResult)
+async def detect_fraud(data: Dict[str, str]):
+    if not data.get("image_data"):
+        return DetectionResult(
+            detections=[],
+            is_fraud=False,
+            timestamp=datetime.now().isoformat(),
+            error="image_data is required"
+        )
+
+    return await _run_detection(data["image_data"], data.get("session_id"))
+
+@router.post("/detect/frame", response_model=DetectionResult)
+async def detect_fraud_frame(request: Request):
+    """Detect on a raw JPEG sent as application/octet-stream or multipart.
+
+    Clients that send an X-Session-Id header (or ?session_id=) get frame
+    gating: unchanged frames reuse the previous result.
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("image") or form.get("file")
+        image_data = await upload.read() if hasattr(upload, "read") else b""
+    else:
+        image_data = await request.body()
+
+    if not image_data:
+        return DetectionResult(
+            detections=[],
+            is_fraud=False,
+            timestamp=datetime.now().isoformat(),
+            error="image bytes are required"
+        )
+
+    session_id = request.headers.get("x-session-id") or request.query_params.get("session_id")
+    return await _run_detection(image_data, session_id)
+
+@router.get("/batching")
+def batching_stats():
+    return {
+        **detection_batcher.stats.as_dict(),
+        "queue_depth": detection_batcher.queue_depth,
+        "max_wait_ms": detection_batcher.max_wait * 1000,
+        "gated_sessions": len(gate_registry),
+    }
+
+async def _authorize_stream(websocket: WebSocket, exam_id: int) -> Optional[Principal]:
+    """The supervisor opening the stream, if they may watch `exam_id`.
+
+    Browsers cannot set headers on a WebSocket, so the bearer token comes
+    in ?token=, or in the Authorization header from other clients.
+    """
+    scheme, _, token = websocket.headers.get("authorization", "").partition(" ")
+    token = websocket.query_params.get("token") or (token if scheme.lower() == "bearer" else "")
+    if not token:
+        return None
+    try:
+        principal = await get_current_supervisor(await get_current_user(token))
+    except HTTPException:
+        return None
+    if not await run_in_session(ExamService.exam_exists, exam_id=exam_id, user=principal):
+        return None
+    return principal
+
+@router.websocket("/stream/{exam_id}")
+async def stream_detection(websocket: WebSocket, exam_id: int):
+    """Streaming detection for one webcam.
+
+    Needs a supervisor token (?token=) with access to the exam; the
+    handshake is refused otherwise. Binary messages are JPEG frames, each
+    answered with a "detection" message. Text messages are JSON commands:
+    {"min_confidence": 0.6} updates the session threshold,
+    {"action": "incidents"} returns the rolling incident buffer.
+    """
+    if await _authorize_stream(websocket, exam_id) is None:
+        # Same answer for a bad token and an unknown exam, as the HTTP routes give
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Exam not found or access denied")
+        return
+
+    await websocket.accept()
+    session = DetectionSession(
+        exam_id=exam_id,
+        max_incidents=settings.DETECTION_SESSION_MAX_INCIDENTS,
+        gate=new_gate() if settings.DETECTION_GATE_ENABLED else None,
+    )
+
+    def submit(frame: bytes):
+        return detection_batcher.submit(frame, session.min_confidence)
+
+    async def run_inference():
+        while True:
+            frame = await session.next_frame()
+            try:
+                if session.gate is not None:
+                    result = await session.gate.detect(frame, submit)
+                else:
+                    result = await submit(frame)
+            except InferenceQueueFull:
+                result = {
+                    "detections": [],
+                    "is_fraud": False,
+                    "timestamp": datetime.now().isoformat(),
+                    "error": "Detection service is busy"
+                }
+            except Exception as e:
+                # A failed frame must not end the task: every later frame
+                # would go unanswered while the socket stays open
+                logger.exception("Streaming detection failed for exam %s", exam_id)
+                result = {
+                    "detections": [],
+                    "is_fraud": False,
+                    "timestamp": datetime.now().isoformat(),
+                    "error": f"Processing error: {str(e)}"
+                }
+            session.record(result)
+            await websocket.send_json({
+                "type": "detection",
+                **result,
+                "frames_dropped": session.frames_dropped,
+            })
+
+    async def close_failed() -> None:
+        try:
+            await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+        except RuntimeError:
+            pass  # Already closed by the client
+
+    def close_if_failed(task: asyncio.Task) -> None:
+        # E.g. sending a result failed: stop taking frames nobody will answer
+        if not task.cancelled() and task.exception() is not None:
+            asyncio.create_task(close_failed())
+
+    inference_task = asyncio.create_task(run_inference())
+    inference_task.add_done_callback(close_if_failed)
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes"):
+                session.offer(message["bytes"])
+            elif message.get("text"):
+                try:
+                    command = json.loads(message["text"])
+                    if command.get("action") == "incidents":
+                        await websocket.send_json({
+                            "type": "incidents",
+                            "incidents": list(session.incidents),
+                        })
+                        continue
+                    session.configure(command)
+                except (ValueError, TypeError, AttributeError) as e:
+                    await websocket.send_json({"type": "error", "error": str(e)})
+                    continue
+                await websocket.send_json({"type": "session", **session.summary()})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        inference_task.cancel()
+        await asyncio.gather(inference_task, return_exceptions=True)
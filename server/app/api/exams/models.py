@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import JSON, Column, Integer, String, ForeignKey, Boolean, DateTime, Text
+from sqlalchemy import JSON, Column, Index, Integer, String, ForeignKey, Boolean, DateTime, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -17,4 +17,38 @@ class Exam(Base):
     class_id = Column(Integer, ForeignKey("classes.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
-    class_ = relationship("Class", back_populates="exams", lazy="joined")
\ No newline at end of file
+    class_ = relationship("Class", back_populates="exams", lazy="joined")
+    incidents = relationship(
+        "FraudIncident",
+        back_populates="exam",
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
+
+    __table_args__ = (
+        # Keyset pagination, unfiltered and per filter column
+        Index('ix_exam_created_id', 'created_at', 'id'),
+        Index('ix_exam_class_created_id', 'class_id', 'created_at', 'id'),
+        Index('ix_exam_status_created_id', 'status', 'created_at', 'id'),
+        Index('ix_exam_fraud_status_created_id', 'fraud_status', 'created_at', 'id'),
+        Index('ix_exam_exam_date', 'exam_date'),
+    )
+
+class FraudIncident(Base):
+    __tablename__ = "fraud_incidents"
+
+    id = Column(Integer, primary_key=True, index=True)
+    exam_id = Column(Integer, ForeignKey("exams.id", ondelete="CASCADE"), nullable=False)
+    student_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    timestamp = Column(DateTime(timezone=True), nullable=False)
+    # Content hashes of the screenshot and its thumbnail in the blob store
+    screenshot_hash = Column(String(64), nullable=True, index=True)
+    thumbnail_hash = Column(String(64), nullable=True)
+    detections = Column(JSON, nullable=False, default=list)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    exam = relationship("Exam", back_populates="incidents")
+
+    __table_args__ = (
+        Index('ix_fraud_incident_exam_timestamp', 'exam_id', 'timestamp', 'student_id'),
+    )
@@ -1,60 +1,169 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
-from .schemas import ExamResponse, ExamCreate, ExamUpdate
+from typing import List, Optional
+from .schemas import (
+    ExamStatus,
+    ExamResponse,
+    ExamSummaryResponse,
+    ExamCreate,
+    ExamUpdate,
+    FraudIncidentCreate,
+    FraudIncidentResponse,
+)
 from .services import ExamService
-from app.core.database import get_db
+from app.core.database import get_db, get_db_session, render, run_db
+from app.core.pagination import set_next_cursor
+from app.core.replicas import get_read_db_session
 from app.api.auth.services import get_current_admin, get_current_supervisor, get_current_user
-from app.api.users.models import User
+from app.api.auth.principals import Principal
 
 router = APIRouter(prefix="/exams", tags=["exams"])
 
-@router.get("/", response_model=List[ExamResponse])
-def get_all_exams(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_supervisor) 
+@router.get("/", response_model=List[ExamSummaryResponse])
+async def get_all_exams(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    class_id: Optional[int] = None,
+    exam_status: Optional[ExamStatus] = Query(None, alias="status"),
+    fraud_status: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    db: Session = Depends(get_read_db_session),
+    current_user: Principal = Depends(get_current_supervisor) 
 ):
-    return ExamService.get_all_exams(db, user=current_user, skip=skip, limit=limit)
+    def load(session: Session):
+        exams, next_cursor = ExamService.get_all_exams(
+            session,
+            user=current_user,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            class_id=class_id,
+            status=exam_status,
+            fraud_status=fraud_status,
+            date_from=date_from,
+            date_to=date_to
+        )
+        return render(List[ExamSummaryResponse], exams), next_cursor
+
+    response, next_cursor = await run_db(db, load)
+    set_next_cursor(response, next_cursor)
+    return response
 
 @router.post("/", response_model=ExamResponse, status_code=status.HTTP_201_CREATED)
 def create_exam(
     exam_data: ExamCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin) 
+    current_user: Principal = Depends(get_current_admin) 
 ):
     return ExamService.create_exam(db, exam_data)
 
-@router.get("/class/{class_id}", response_model=List[ExamResponse])
-def get_exams_by_class(
+@router.get("/class/{class_id}", response_model=List[ExamSummaryResponse])
+async def get_exams_by_class(
     class_id: int,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_supervisor)  
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    exam_status: Optional[ExamStatus] = Query(None, alias="status"),
+    fraud_status: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    db: Session = Depends(get_read_db_session),
+    current_user: Principal = Depends(get_current_supervisor)  
 ):
-    return ExamService.get_exams_by_class(
-        db, 
-        class_id=class_id, 
-        user=current_user,
-        skip=skip, 
-        limit=limit
-    )
+    def load(session: Session):
+        exams, next_cursor = ExamService.get_exams_by_class(
+            session,
+            class_id=class_id,
+            user=current_user,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            status=exam_status,
+            fraud_status=fraud_status,
+            date_from=date_from,
+            date_to=date_to
+        )
+        return render(List[ExamSummaryResponse], exams), next_cursor
+
+    response, next_cursor = await run_db(db, load)
+    set_next_cursor(response, next_cursor)
+    return response
 
 @router.get("/{exam_id}", response_model=ExamResponse)
-def get_exam(
+async def get_exam(
+    exam_id: int,
+    db: Session = Depends(get_db_session),
+    current_user: Principal = Depends(get_current_supervisor) 
+):
+    def load(session: Session):
+        db_exam = ExamService.get_exam(session, exam_id=exam_id, user=current_user)
+        return render(ExamResponse, db_exam) if db_exam else None
+
+    response = await run_db(db, load)
+    if response is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Exam not found or access denied"
+        )
+    return response
+
+@router.post(
+    "/{exam_id}/incidents",
+    response_model=FraudIncidentResponse,
+    status_code=status.HTTP_201_CREATED
+)
+def add_incident(
     exam_id: int,
+    incident_data: FraudIncidentCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_supervisor) 
+    current_user: Principal = Depends(get_current_supervisor)
 ):
-    db_exam = ExamService.get_exam(db, exam_id=exam_id, user=current_user)
-    if not db_exam:
+    # Stays on a sync session: storing the screenshot writes blobs and
+    # resizes the thumbnail, which must not run on the event loop
+    if not ExamService.exam_exists(db, exam_id=exam_id, user=current_user):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Exam not found or access denied"
         )
-    return db_exam
+    try:
+        return ExamService.add_incident(db, exam_id=exam_id, incident_data=incident_data)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.get("/{exam_id}/incidents", response_model=List[FraudIncidentResponse])
+async def get_incidents(
+    exam_id: int,
+    student_id: Optional[int] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db_session),
+    current_user: Principal = Depends(get_current_supervisor)
+):
+    def load(session: Session):
+        if not ExamService.exam_exists(session, exam_id=exam_id, user=current_user):
+            return None
+        incidents = ExamService.get_incidents(
+            session,
+            exam_id=exam_id,
+            student_id=student_id,
+            skip=skip,
+            limit=limit
+        )
+        return render(List[FraudIncidentResponse], incidents)
+
+    response = await run_db(db, load)
+    if response is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Exam not found or access denied"
+        )
+    return response
 
 @router.put("/{exam_id}", response_model=ExamResponse)
 def update_exam(
@@ -74,7 +183,7 @@ def update_exam(
 def delete_exam(
     exam_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin) 
+    current_user: Principal = Depends(get_current_admin) 
 ):
     success = ExamService.delete_exam(db, exam_id=exam_id)
     if not success:
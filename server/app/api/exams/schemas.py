@@ -1,9 +1,11 @@
 from typing import List, Dict, Any
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, field_validator
 from typing import Optional
 from datetime import datetime
 from enum import Enum
 from .models import Exam
+from app.core.storage import signed_blob_url
+from app.schemas.detection import DetectionItem
 
 
 class ExamStatus(str, Enum):
@@ -26,6 +28,14 @@ class ExamUpdate(BaseModel):
     status: Optional[ExamStatus] = None
     fraud_status: Optional[str] = None
     fraud_evidence: Optional[List[Dict[str, Any]]] = None
+
+    @field_validator("fraud_evidence")
+    @classmethod
+    def no_screenshots(cls, value):
+        # Images belong in the blob store, not inline in the exam row
+        if value and any(item.get("screenshot") for item in value):
+            raise ValueError("Upload screenshots through POST /exams/{exam_id}/incidents")
+        return value
     
 
 class ClassInfo(BaseModel):
@@ -49,3 +59,62 @@ class ExamResponse(ExamBase):
         return cls(**exam_data)
     
     model_config = ConfigDict(from_attributes=True)
+
+class ExamSummaryResponse(ExamBase):
+    """List view of an exam: no evidence payload, just incident stats"""
+    id: int
+    sale: Optional[str] = None
+    fraud_status: Optional[str] = None
+    created_at: datetime
+    class_info: ClassInfo
+    incident_count: int = 0
+    latest_incident_at: Optional[datetime] = None
+
+    @classmethod
+    def from_row(cls, db_exam: Exam, incident_count: Optional[int], latest_incident_at: Optional[datetime]):
+        return cls(
+            id=db_exam.id,
+            name=db_exam.name,
+            exam_date=db_exam.exam_date,
+            class_id=db_exam.class_id,
+            status=db_exam.status,
+            sale=db_exam.sale,
+            fraud_status=db_exam.fraud_status,
+            created_at=db_exam.created_at,
+            class_info={
+                "name": db_exam.class_.name,
+                "studying_program": db_exam.class_.studying_program
+            },
+            incident_count=incident_count or 0,
+            latest_incident_at=latest_incident_at
+        )
+
+class FraudIncidentBase(BaseModel):
+    timestamp: datetime
+    student_id: Optional[int] = None
+    detections: List[DetectionItem] = []
+
+class FraudIncidentCreate(FraudIncidentBase):
+    screenshot: Optional[str] = None  # data URL or bare base64 JPEG
+
+class FraudIncidentResponse(FraudIncidentBase):
+    id: int
+    exam_id: int
+    screenshot_url: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    created_at: datetime
+
+    @classmethod
+    def from_orm(cls, db_incident):
+        return cls(
+            id=db_incident.id,
+            exam_id=db_incident.exam_id,
+            timestamp=db_incident.timestamp,
+            student_id=db_incident.student_id,
+            detections=db_incident.detections,
+            screenshot_url=signed_blob_url(db_incident.screenshot_hash) if db_incident.screenshot_hash else None,
+            thumbnail_url=signed_blob_url(db_incident.thumbnail_hash) if db_incident.thumbnail_hash else None,
+            created_at=db_incident.created_at
+        )
+
+    model_config = ConfigDict(from_attributes=True)
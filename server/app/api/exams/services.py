@@ -1,49 +1,106 @@
-from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional
+from datetime import datetime
+from sqlalchemy.orm import Session, defer, joinedload
+from typing import List, Optional, Tuple
 
 from ..classes.models import UserClassAssociation
-from .models import Exam
-from app.api.users.models import User
-from .schemas import ExamCreate, ExamResponse, ExamUpdate
+from .models import Exam, FraudIncident
+from app.api.auth.principals import Principal
+from .schemas import (
+    ExamCreate,
+    ExamResponse,
+    ExamSummaryResponse,
+    ExamUpdate,
+    FraudIncidentCreate,
+    FraudIncidentResponse,
+)
 from sqlalchemy.sql import func
-from sqlalchemy import or_
+from sqlalchemy import exists, or_, select, update
+from app.core.pagination import paginate
+from app.core.storage import blob_key, decode_data_url, save_screenshot
 
 class ExamService:
-    
+
+    @staticmethod
+    def _summary_query(db: Session):
+        """Exams without their evidence column, plus per-exam incident stats"""
+        # Correlated per row, so only the exams on the page are counted, each
+        # through the (exam_id, timestamp) index
+        incident_count = select(func.count(FraudIncident.id)).where(
+            FraudIncident.exam_id == Exam.id
+        ).correlate(Exam).scalar_subquery()
+        latest_incident_at = select(func.max(FraudIncident.timestamp)).where(
+            FraudIncident.exam_id == Exam.id
+        ).correlate(Exam).scalar_subquery()
+
+        return db.query(
+            Exam,
+            incident_count.label("incident_count"),
+            latest_incident_at.label("latest_incident_at")
+        ).options(
+            defer(Exam.fraud_evidence),
+            joinedload(Exam.class_)
+        )
+
     @staticmethod
     def get_all_exams(
         db: Session, 
-        user: User = None,
+        user: Optional[Principal] = None,
         skip: int = 0, 
-        limit: int = 100
-    ) -> List[ExamResponse]:
-        query = db.query(Exam).options(joinedload(Exam.class_))
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        class_id: Optional[int] = None,
+        status: Optional[str] = None,
+        fraud_status: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None
+    ) -> Tuple[List[ExamSummaryResponse], Optional[str]]:
+        """One page of exam summaries in (created_at, id) order, plus the next cursor"""
+        query = ExamService._summary_query(db)
+
+        if class_id is not None:
+            query = query.filter(Exam.class_id == class_id)
+        if status is not None:
+            query = query.filter(Exam.status == status)
+        if fraud_status is not None:
+            query = query.filter(Exam.fraud_status == fraud_status)
+        if date_from is not None:
+            query = query.filter(Exam.exam_date >= date_from)
+        if date_to is not None:
+            query = query.filter(Exam.exam_date < date_to)
         
         if user and user.role_id == 2:
-            query = query.join(Exam.class_).join(
-                UserClassAssociation,
-                Exam.class_id == UserClassAssociation.class_id
-            ).filter(
-                UserClassAssociation.user_id == user.id
+            # EXISTS instead of a join, so an exam can never come back twice
+            query = query.filter(
+                exists().where(
+                    UserClassAssociation.class_id == Exam.class_id,
+                    UserClassAssociation.user_id == user.id
+                )
             )
-            
-        exams = query.offset(skip).limit(limit).all()
-        return [ExamResponse.from_orm(exam) for exam in exams]
+
+        rows, next_cursor = paginate(
+            query,
+            (Exam.created_at, Exam.id),
+            key=lambda row: (row[0].created_at, row[0].id),
+            limit=limit,
+            cursor=cursor,
+            skip=skip
+        )
+        return [ExamSummaryResponse.from_row(*row) for row in rows], next_cursor
     
     @staticmethod
     def get_exam(
         db: Session, 
         exam_id: int,
-        user: User = None
+        user: Optional[Principal] = None
     ) -> Optional[ExamResponse]:
         query = db.query(Exam).options(joinedload(Exam.class_)).filter(Exam.id == exam_id)
         
         if user and user.role_id == 2:
-            query = query.join(Exam.class_).join(
-                UserClassAssociation,
-                Exam.class_id == UserClassAssociation.class_id
-            ).filter(
-                UserClassAssociation.user_id == user.id
+            query = query.filter(
+                exists().where(
+                    UserClassAssociation.class_id == Exam.class_id,
+                    UserClassAssociation.user_id == user.id
+                )
             )
             
         exam = query.first()
@@ -53,22 +110,21 @@ class ExamService:
     def get_exams_by_class(
         db: Session, 
         class_id: int, 
-        user: User = None,
+        user: Optional[Principal] = None,
         skip: int = 0, 
-        limit: int = 100
-    ) -> List[ExamResponse]:
-        query = db.query(Exam).options(joinedload(Exam.class_)).filter(Exam.class_id == class_id)
-        
-        if user and user.role_id == 2:
-            query = query.join(
-                UserClassAssociation,
-                Exam.class_id == UserClassAssociation.class_id
-            ).filter(
-                UserClassAssociation.user_id == user.id
-            )
-            
-        exams = query.offset(skip).limit(limit).all()
-        return [ExamResponse.from_orm(exam) for exam in exams]
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        **filters
+    ) -> Tuple[List[ExamSummaryResponse], Optional[str]]:
+        return ExamService.get_all_exams(
+            db,
+            user=user,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            class_id=class_id,
+            **filters
+        )
 
     @staticmethod
     def create_exam(db: Session, exam_data: ExamCreate) -> ExamResponse:
@@ -99,4 +155,85 @@ class ExamService:
             db.delete(db_exam)
             db.commit()
             return True
-        return False
\ No newline at end of file
+        return False
+
+    @staticmethod
+    def exam_exists(db: Session, exam_id: int, user: Optional[Principal] = None) -> bool:
+        """Access check that loads neither the exam row nor its evidence"""
+        query = db.query(Exam.id).filter(Exam.id == exam_id)
+
+        if user and user.role_id == 2:
+            query = query.filter(
+                exists().where(
+                    UserClassAssociation.class_id == Exam.class_id,
+                    UserClassAssociation.user_id == user.id
+                )
+            )
+
+        return db.query(query.exists()).scalar()
+
+    @staticmethod
+    def add_incident(
+        db: Session,
+        exam_id: int,
+        incident_data: FraudIncidentCreate
+    ) -> FraudIncidentResponse:
+        """Append one incident; existing incidents are never read or rewritten"""
+        if incident_data.student_id is not None:
+            # Checked before the screenshot is stored, in one round trip
+            enrolled = db.query(
+                exists().where(
+                    UserClassAssociation.user_id == incident_data.student_id,
+                    UserClassAssociation.class_id == select(Exam.class_id).where(
+                        Exam.id == exam_id
+                    ).scalar_subquery()
+                )
+            ).scalar()
+            if not enrolled:
+                raise ValueError(
+                    f"Student {incident_data.student_id} is not enrolled in this exam's class"
+                )
+        data = incident_data.model_dump(exclude={"screenshot"})
+        if incident_data.screenshot:
+            data["screenshot_hash"], data["thumbnail_hash"] = ExamService._store_screenshot(
+                db, decode_data_url(incident_data.screenshot)
+            )
+        db_incident = FraudIncident(exam_id=exam_id, **data)
+        db.add(db_incident)
+        # Flag the exam on its first incident without loading it
+        db.execute(
+            update(Exam)
+            .where(Exam.id == exam_id, Exam.fraud_status.is_(None))
+            .values(fraud_status="SUSPECTED")
+        )
+        db.commit()
+        db.refresh(db_incident)
+        return FraudIncidentResponse.from_orm(db_incident)
+
+    @staticmethod
+    def _store_screenshot(db: Session, data: bytes):
+        """Blob keys for a screenshot, reusing an earlier upload of the same bytes"""
+        key = blob_key(data)
+        existing = db.query(FraudIncident.thumbnail_hash).filter(
+            FraudIncident.screenshot_hash == key
+        ).first()
+        if existing:
+            return key, existing.thumbnail_hash
+        return save_screenshot(data)
+
+    @staticmethod
+    def get_incidents(
+        db: Session,
+        exam_id: int,
+        student_id: Optional[int] = None,
+        skip: int = 0,
+        limit: int = 50
+    ) -> List[FraudIncidentResponse]:
+        query = db.query(FraudIncident).filter(FraudIncident.exam_id == exam_id)
+        if student_id is not None:
+            query = query.filter(FraudIncident.student_id == student_id)
+
+        incidents = query.order_by(
+            FraudIncident.timestamp, FraudIncident.id
+        ).offset(skip).limit(limit).all()
+        return [FraudIncidentResponse.from_orm(incident) for incident in incidents]
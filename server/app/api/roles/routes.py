@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from . import schemas, services  
-from app.core.database import get_db   
+from app.core.database import get_db, get_db_session, render, run_db
+from app.core.pagination import set_next_cursor
 
 router = APIRouter(prefix="/roles", tags=["roles"])
 
@@ -19,12 +20,19 @@ def create_role(role: schemas.RoleCreate, db: Session = Depends(get_db)):
         )
 
 @router.get("/", response_model=List[schemas.RoleResponse])
-def read_roles(
-    skip: int = 0, 
-    limit: int = 100,
-    db: Session = Depends(get_db)
+async def read_roles(
+    skip: int = Query(0, ge=0), 
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db_session)
 ):
-    return services.get_roles(db, skip=skip, limit=limit)
+    def load(session: Session):
+        roles, next_cursor = services.get_roles(session, skip=skip, limit=limit, cursor=cursor)
+        return render(List[schemas.RoleResponse], roles), next_cursor
+
+    response, next_cursor = await run_db(db, load)
+    set_next_cursor(response, next_cursor)
+    return response
 
 @router.get("/{role_id}", response_model=schemas.RoleWithUsersResponse)
 def read_role(
@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
 from . import models, schemas
+from app.core.pagination import paginate
 from fastapi import HTTPException, status
 
 def get_role(db: Session, role_id: int):
@@ -8,8 +9,16 @@ def get_role(db: Session, role_id: int):
 def get_role_by_name(db: Session, name: str):
     return db.query(models.Role).filter(models.Role.name == name).first()
 
-def get_roles(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Role).offset(skip).limit(limit).all()
+def get_roles(db: Session, skip: int = 0, limit: int = 100, cursor: str | None = None):
+    # Roles have no created_at; the primary key alone is the sort key
+    return paginate(
+        db.query(models.Role),
+        (models.Role.id,),
+        key=lambda role: (role.id,),
+        limit=limit,
+        cursor=cursor,
+        skip=skip
+    )
 
 def create_role(db: Session, role: schemas.RoleCreate):
     existing_role = get_role_by_name(db, role.name)
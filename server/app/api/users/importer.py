@@ -0,0 +1,225 @@
+import codecs
+import csv
+import json
+from typing import AsyncIterator, List, Optional, Set, Tuple
+
+from pydantic import BaseModel, ConfigDict, EmailStr, ValidationError, field_validator
+from sqlalchemy.orm import Session
+
+from . import models, schemas
+from ..roles import models as role_models
+from ...core.database import dialect_insert
+from ...core.security import hash_passwords
+
+BATCH_SIZE = 500
+
+# (row number, parsed record or None, parse error or None)
+RawRow = Tuple[int, Optional[dict], Optional[str]]
+
+
+class RosterRow(BaseModel):
+    email: EmailStr
+    full_name: str
+    institutional_id: Optional[str] = None
+    role_id: Optional[int] = None
+    role: Optional[str] = None
+    password: Optional[str] = None
+
+    model_config = ConfigDict(str_strip_whitespace=True, extra="ignore")
+
+    @field_validator("institutional_id", "role_id", "role", "password", mode="before")
+    @classmethod
+    def empty_as_none(cls, value):
+        # CSV has no null, an empty cell means "not given"
+        return None if value == "" else value
+
+    @field_validator("full_name")
+    @classmethod
+    def full_name_required(cls, value: str) -> str:
+        if not value:
+            raise ValueError("full_name is required")
+        return value
+
+
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a byte stream into lines without buffering the whole body"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in stream:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def iter_rows(stream: AsyncIterator[bytes], fmt: str) -> AsyncIterator[RawRow]:
+    """Parse CSV (header row first) or NDJSON records from a byte stream.
+
+    CSV records must fit on one line; quoted multi-line cells are not supported.
+    """
+    header: Optional[List[str]] = None
+    row_number = 0
+    async for line in iter_lines(stream):
+        if not line.strip():
+            continue
+        if fmt == "csv":
+            cells = next(csv.reader([line]))
+            if header is None:
+                header = [cell.strip().lower() for cell in cells]
+                continue
+            row_number += 1
+            if len(cells) != len(header):
+                yield row_number, None, f"Expected {len(header)} columns, got {len(cells)}"
+                continue
+            yield row_number, dict(zip(header, cells)), None
+        else:
+            row_number += 1
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield row_number, None, f"Invalid JSON: {e.msg}"
+                continue
+            if not isinstance(record, dict):
+                yield row_number, None, "Expected a JSON object"
+                continue
+            yield row_number, record, None
+
+
+class RosterImport:
+    """State of one import across batches: roles and values already seen in the file"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        roles = db.query(role_models.Role.id, role_models.Role.name).all()
+        self.role_ids = {role_id for role_id, _ in roles}
+        self.roles_by_name = {name.lower(): role_id for role_id, name in roles}
+        self.default_role_id = self.roles_by_name.get("student")
+        self.seen_emails: Set[str] = set()
+        self.seen_institutional_ids: Set[str] = set()
+        self.report = schemas.UserImportReport()
+
+    def _fail(self, row_number: int, email: Optional[str], errors: List[str]) -> None:
+        self.report.failed += 1
+        self.report.errors.append(
+            schemas.UserImportError(row=row_number, email=email, errors=errors)
+        )
+
+    def _validate(self, batch: List[RawRow]) -> List[Tuple[int, RosterRow, int]]:
+        """Per-row checks that need no database round trip"""
+        valid = []
+        for row_number, record, parse_error in batch:
+            self.report.total += 1
+            if parse_error:
+                self._fail(row_number, None, [parse_error])
+                continue
+            try:
+                row = RosterRow.model_validate(record)
+            except ValidationError as e:
+                self._fail(row_number, record.get("email"), [
+                    f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                    for error in e.errors()
+                ])
+                continue
+
+            errors = []
+            if row.role_id is not None:
+                role_id = row.role_id if row.role_id in self.role_ids else None
+            elif row.role is not None:
+                role_id = self.roles_by_name.get(row.role.lower())
+            else:
+                role_id = self.default_role_id
+            if role_id is None:
+                errors.append("Invalid role")
+            elif role_id != 1 and not row.password:
+                errors.append("Password is required for non-student roles")
+            if row.email in self.seen_emails:
+                errors.append("Duplicate email in file")
+            if row.institutional_id and row.institutional_id in self.seen_institutional_ids:
+                errors.append("Duplicate institutional ID in file")
+
+            self.seen_emails.add(row.email)
+            if row.institutional_id:
+                self.seen_institutional_ids.add(row.institutional_id)
+            if errors:
+                self._fail(row_number, row.email, errors)
+                continue
+            valid.append((row_number, row, role_id))
+        return valid
+
+    def import_batch(self, batch: List[RawRow]) -> None:
+        """Validate, dedupe against the database, hash and insert one batch"""
+        first_error = len(self.report.errors)
+        try:
+            self._import_batch(batch)
+        finally:
+            # Checks run in stages, each appending its failures; report them
+            # in file order. Earlier batches hold earlier rows already.
+            self.report.errors[first_error:] = sorted(
+                self.report.errors[first_error:], key=lambda error: error.row
+            )
+
+    def _import_batch(self, batch: List[RawRow]) -> None:
+        valid = self._validate(batch)
+        if not valid:
+            return
+
+        # Two set-based lookups for the whole batch instead of two per row
+        emails = [row.email for _, row, _ in valid]
+        institutional_ids = [row.institutional_id for _, row, _ in valid if row.institutional_id]
+        taken_emails = {
+            email for (email,) in self.db.query(models.User.email).filter(
+                models.User.email.in_(emails)
+            )
+        }
+        taken_ids = {
+            institutional_id for (institutional_id,) in self.db.query(models.User.institutional_id).filter(
+                models.User.institutional_id.in_(institutional_ids)
+            )
+        } if institutional_ids else set()
+
+        pending = []
+        for row_number, row, role_id in valid:
+            errors = []
+            if row.email in taken_emails:
+                errors.append("Email already registered")
+            if row.institutional_id in taken_ids:
+                errors.append("Institutional ID already exists")
+            if errors:
+                self._fail(row_number, row.email, errors)
+            else:
+                pending.append((row_number, row, role_id))
+        if not pending:
+            return
+
+        with_password = [i for i, (_, row, _) in enumerate(pending) if row.password]
+        hashes = dict(zip(
+            with_password,
+            hash_passwords([pending[i][1].password for i in with_password])
+        ))
+        values = [
+            {
+                "email": row.email,
+                "password_hash": hashes.get(i),
+                "full_name": row.full_name,
+                "institutional_id": row.institutional_id,
+                "role_id": role_id,
+            }
+            for i, (_, row, role_id) in enumerate(pending)
+        ]
+
+        # A concurrent insert can still take an email between the lookup and
+        # here; those rows are skipped by the database and reported
+        statement = dialect_insert(self.db)(models.User).on_conflict_do_nothing().returning(
+            models.User.email
+        )
+        inserted = set(self.db.execute(statement, values).scalars())
+        self.db.commit()
+
+        for row_number, row, _ in pending:
+            if row.email in inserted:
+                self.report.created += 1
+            else:
+                self._fail(row_number, row.email, ["Email or institutional ID already exists"])
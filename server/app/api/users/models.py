@@ -30,6 +30,7 @@ class User(Base):
     full_name = Column(String(100), nullable=False)
     institutional_id = Column(String(50), unique=True, nullable=True)
     role_id = Column(Integer, ForeignKey("roles.id"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     role = relationship("Role", back_populates="users")
     password_reset_tokens = relationship(
@@ -55,4 +56,10 @@ class User(Base):
         elif self.role_id == 2: 
             return [assoc.class_ for assoc in self.classes.all()]
         return []
+
+    __table_args__ = (
+        # Keyset pagination, optionally within a role
+        Index('ix_user_created_id', 'created_at', 'id'),
+        Index('ix_user_role_created_id', 'role_id', 'created_at', 'id'),
+    )
     
\ No newline at end of file
@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
-from typing import List
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
 from ..classes.services import ClassService
 from . import schemas, services  
-from app.core.database import get_db   
+from .importer import BATCH_SIZE, RosterImport, iter_rows
+from app.api.auth.services import get_current_admin
+from app.core.config import settings
+from app.core.database import get_db, get_db_session, render, run_db, statement_timeout
+from app.core.pagination import set_next_cursor
+from app.core.replicas import get_read_db_session
 from ..classes import models
 
 
@@ -21,24 +27,78 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
             detail=f"Unexpected error: {str(e)}"
         )
 
+@router.post("/import", response_model=schemas.UserImportReport)
+async def import_users(
+    request: Request,
+    file_format: Optional[str] = Query(None, alias="format", pattern="^(csv|ndjson)$"),
+    db: Session = Depends(statement_timeout(settings.DB_BULK_STATEMENT_TIMEOUT_MS)),
+    current_user = Depends(get_current_admin)
+):
+    """Create users from a CSV (with header) or NDJSON body, streamed in batches.
+
+    Columns: email, full_name, institutional_id, role_id or role (name),
+    password. Valid rows are created even when others fail; every failed row
+    is listed in the report.
+    """
+    if file_format is None:
+        content_type = request.headers.get("content-type", "")
+        file_format = "csv" if "csv" in content_type else "ndjson" if "json" in content_type else None
+    if file_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send text/csv or application/x-ndjson, or pass ?format="
+        )
+
+    # Sync session on worker threads even with DB_ASYNC: batches wait on
+    # the bcrypt pool, which must not happen on the event loop
+    roster = await run_in_threadpool(RosterImport, db)
+    batch = []
+    async for row in iter_rows(request.stream(), file_format):
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            await run_in_threadpool(roster.import_batch, batch)
+            batch = []
+    if batch:
+        await run_in_threadpool(roster.import_batch, batch)
+    return roster.report
+
 @router.get("/", response_model=List[schemas.UserResponse])
-def read_users(
-    skip: int = 0, 
-    limit: int = 100,
-    db: Session = Depends(get_db)
+async def read_users(
+    skip: int = Query(0, ge=0), 
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    role_id: Optional[int] = None,
+    class_id: Optional[int] = None,
+    db: Session = Depends(get_read_db_session)
 ):
-    users = services.get_users(db, skip=skip, limit=limit)
-    return [schemas.UserResponse.from_orm(user) for user in users]
+    def load(session: Session):
+        users, next_cursor = services.get_users(
+            session,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            role_id=role_id,
+            class_id=class_id
+        )
+        return render(List[schemas.UserResponse], [schemas.UserResponse.from_orm(user) for user in users]), next_cursor
+
+    response, next_cursor = await run_db(db, load)
+    set_next_cursor(response, next_cursor)
+    return response
 
 @router.get("/{user_id}", response_model=schemas.UserResponse)
-def read_user(user_id: int, db: Session = Depends(get_db)):
-    db_user = services.get_user(db, user_id=user_id)
-    if not db_user:
+async def read_user(user_id: int, db: Session = Depends(get_db_session)):
+    def load(session: Session):
+        db_user = services.get_user(session, user_id=user_id)
+        return render(schemas.UserResponse, schemas.UserResponse.from_orm(db_user)) if db_user else None
+
+    response = await run_db(db, load)
+    if response is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    return schemas.UserResponse.from_orm(db_user)
+    return response
 
 @router.patch("/{user_id}", response_model=schemas.UserResponse)
 def update_user(
@@ -110,43 +170,37 @@ def bulk_assign_users(
     assignment: schemas.BulkClassAssignment,  # Receive as Pydantic model
     db: Session = Depends(get_db)
 ):
+    if not db.query(models.Class.id).filter(models.Class.id == assignment.class_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Class not found"
+        )
+
     try:
-        count = 0
-        skipped = 0
-        for user_id in assignment.user_ids:  # Access via assignment object
-            try:
-                user = services.get_user(db, user_id=user_id)
-                if not user:
-                    skipped += 1
-                    continue
-                    
-                # Check student assignment limit
-                if user.role_id == 1 and len(user.classes) > 0:
-                    skipped += 1
-                    continue
-                
-                ClassService.add_user_to_class(
-                    db,
-                    class_id=assignment.class_id,  # Access via assignment object
-                    user_id=user_id,
-                    is_professor=False
-                )
-                count += 1
-            except Exception:
-                skipped += 1
-                continue
-        
-        return {
-            "success": True, 
-            "count": count,
-            "skipped": skipped,
-            "message": f"Assigned {count} users, skipped {skipped}"
-        }
+        results = ClassService.bulk_add_users_to_class(
+            db,
+            class_id=assignment.class_id,
+            user_ids=assignment.user_ids
+        )
     except Exception as e:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
+
+    count = sum(outcome == "assigned" for outcome in results.values())
+    skipped = len(results) - count
+    return {
+        "success": True, 
+        "count": count,
+        "skipped": skipped,
+        "results": [
+            {"user_id": user_id, "status": outcome}
+            for user_id, outcome in results.items()
+        ],
+        "message": f"Assigned {count} users, skipped {skipped}"
+    }
         
 # In your users/router.py
 @router.delete("/{user_id}/remove-class/{class_id}", response_model=schemas.GenericResponse)
@@ -173,12 +227,7 @@ def remove_user_from_class(
             )
         
         # Remove the association
-        db.query(models.UserClassAssociation).filter(
-            models.UserClassAssociation.user_id == user_id,
-            models.UserClassAssociation.class_id == class_id
-        ).delete()
-        
-        db.commit()
+        ClassService.remove_user_from_class(db, class_id=class_id, user_id=user_id)
         
         return {
             "success": True,
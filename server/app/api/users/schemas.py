@@ -26,12 +26,29 @@ class GenericResponse(BaseModel):
     message: str | None = None
     model_config = ConfigDict(from_attributes=True)
 
+class BulkAssignmentResult(BaseModel):
+    user_id: int
+    status: str  # assigned, already_assigned, not_found or student_has_class
+
 class BulkAssignmentResponse(BaseModel):
     success: bool
     count: int
+    skipped: int = 0
+    results: List[BulkAssignmentResult] = []
     message: str | None = None
     model_config = ConfigDict(from_attributes=True)
 
+class UserImportError(BaseModel):
+    row: int  # 1-based, not counting the CSV header
+    email: str | None = None
+    errors: List[str]
+
+class UserImportReport(BaseModel):
+    total: int = 0
+    created: int = 0
+    failed: int = 0
+    errors: List[UserImportError] = []
+
 class ClassAssignment(BaseModel):
     class_id: int
     model_config = ConfigDict(from_attributes=True)
@@ -1,26 +1,58 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import exists
+from sqlalchemy.orm import Session, joinedload, selectinload
 from . import models, schemas
+from ..auth.principals import invalidate_principals
 from ..classes.models import UserClassAssociation 
 from ..roles import models as role_models, services as role_services
+from ...core.pagination import paginate
 from ...core.security import get_password_hash
 from fastapi import HTTPException, status
 
+def _user_options():
+    # The role is a single row, so it rides along in the user query; classes
+    # are a collection and come from one extra SELECT ... WHERE user_id IN (...)
+    # instead of multiplying the user rows
+    return (
+        joinedload(models.User.role),
+        selectinload(models.User.classes).joinedload(UserClassAssociation.class_)
+    )
+
 def get_user(db: Session, user_id: int):
     return db.query(models.User).options(
-        joinedload(models.User.role),
-        joinedload(models.User.classes).joinedload(UserClassAssociation.class_)
+        *_user_options()
     ).filter(models.User.id == user_id).first()
 
-def get_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.User).options(
-        joinedload(models.User.role),
-        joinedload(models.User.classes).joinedload(UserClassAssociation.class_)
-    ).offset(skip).limit(limit).all()
+def get_users(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    role_id: int | None = None,
+    class_id: int | None = None
+):
+    """One page of users in (created_at, id) order, plus the next cursor"""
+    query = db.query(models.User).options(*_user_options())
+    if role_id is not None:
+        query = query.filter(models.User.role_id == role_id)
+    if class_id is not None:
+        query = query.filter(
+            exists().where(
+                UserClassAssociation.user_id == models.User.id,
+                UserClassAssociation.class_id == class_id
+            )
+        )
+    return paginate(
+        query,
+        (models.User.created_at, models.User.id),
+        key=lambda user: (user.created_at, user.id),
+        limit=limit,
+        cursor=cursor,
+        skip=skip
+    )
 
 def get_user_by_email(db: Session, email: str):
     return db.query(models.User).options(
-        joinedload(models.User.role),
-        joinedload(models.User.classes).joinedload(UserClassAssociation.class_)
+        *_user_options()
     ).filter(models.User.email == email).first()
 
 
@@ -110,6 +142,7 @@ def update_user(db: Session, user_id: int, user_update: schemas.UserUpdate):
     
     try:
         db.commit()
+        invalidate_principals(user_id)
         db.refresh(db_user)
         # Reload with relationships to return complete data
         return get_user(db, user_id)
@@ -127,6 +160,7 @@ def delete_user(db: Session, user_id: int):
     try:
         db.delete(db_user)
         db.commit()
+        invalidate_principals(user_id)
         return True
     except Exception as e:
         db.rollback()
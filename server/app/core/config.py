@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import EmailStr, AnyHttpUrl
+from typing import List
 
 class Settings(BaseSettings):
     # Security settings
@@ -14,12 +15,38 @@ class Settings(BaseSettings):
     DB_PASSWORD: str
     DB_PORT: str = "5432"
     DB_HOST: str = "localhost"
+    DB_ASYNC: bool = False  # Serve the API routers through asyncpg instead of psycopg2 worker threads
+    # Shared by up to 40 threadpool handlers, detection and the import route;
+    # size it from db_pool_checkout_seconds and db_pool_overflow_total
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT: float = 10  # Seconds a checkout waits before the request gets a 503
+    DB_POOL_RECYCLE_SECONDS: int = 3600
+    DB_STATEMENT_TIMEOUT_MS: int = 5000  # API requests; 0 disables
+    DB_BULK_STATEMENT_TIMEOUT_MS: int = 60000  # Roster import statements
+    # Separate pool for long reporting queries and maintenance jobs, so they
+    # never hold the connections requests wait on
+    DB_REPORTING_POOL_SIZE: int = 2
+    DB_REPORTING_MAX_OVERFLOW: int = 0
+    DB_REPORTING_STATEMENT_TIMEOUT_MS: int = 300000
+    # Read replicas for the busiest list and detail routes
+    DB_REPLICA_URLS: str = ""  # Comma-separated postgresql:// (or sqlite:/// stand-in) URLs; empty reads from the primary
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5  # Replicas further behind are skipped; also how long a writer reads from the primary
+    DB_REPLICA_LAG_CHECK_SECONDS: float = 5
     
     # Email settings
     SMTP_HOST: str
     SMTP_PORT: int = 587
-    SMTP_USER: str
-    SMTP_PASSWORD: str
+    SMTP_USER: str = ""  # Empty skips login, e.g. for a local SMTP stand-in
+    SMTP_PASSWORD: str = ""
+    SMTP_TLS: str = "starttls"  # "starttls", "ssl" (implicit TLS) or "none"
+    SMTP_TIMEOUT: float = 10
+    SMTP_POOL_SIZE: int = 2  # Connections, and sender workers, kept open
+    SMTP_IDLE_SECONDS: float = 30  # Idle connections are checked with NOOP before reuse
+    EMAIL_QUEUE_MAX_SIZE: int = 1000
+    EMAIL_BATCH_SIZE: int = 20  # Messages sent per connection checkout
+    EMAIL_MAX_ATTEMPTS: int = 5
+    EMAIL_RETRY_BASE_SECONDS: float = 2  # Doubles on every attempt
     EMAILS_FROM_EMAIL: EmailStr
     EMAILS_FROM_NAME: str = "Your App Name"
     
@@ -28,11 +55,61 @@ class Settings(BaseSettings):
     
     # Security
     PASSWORD_RESET_RATE_LIMIT: int = 3  # Max requests per 15 minutes
-    
+    PASSWORD_HASH_WORKERS: int = 0  # bcrypt threads; 0 means min(4, CPU count)
+    PASSWORD_HASH_MAX_PENDING: int = 64  # Hash/verify jobs queued or running before login answers 503
+    # 0 disables the authenticated user cache. Changes reach every worker's
+    # cache through LISTEN/NOTIFY; a worker whose listener is down (or a
+    # non-PostgreSQL database) keeps a revoked role for up to this long
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30
+
+    # Detection settings
+    DETECTION_EXECUTOR: str = "thread"  # "thread" or "process"
+    DETECTION_WORKERS: int = 2
+    DETECTION_MAX_PENDING: int = 8  # Batches queued or running before we answer 503
+    DETECTION_BATCH_SIZE: int = 8  # Max frames per model call
+    DETECTION_BATCH_WAIT_MS: int = 10  # Max time the first frame waits for a batch to fill
+    DETECTION_SESSION_MAX_INCIDENTS: int = 50  # Rolling incident buffer per stream
+    DETECTION_BACKEND: str = "pytorch"  # "pytorch" or "onnx"
+    DETECTION_ONNX_PATH: str = ""  # Defaults to the .pt path with an .onnx suffix
+    DETECTION_ONNX_INT8: bool = False  # Dynamic INT8 weight quantization
+    DETECTION_ONNX_INTRA_OP_THREADS: int = 0  # 0 lets ONNX Runtime decide
+    DETECTION_ONNX_INTER_OP_THREADS: int = 0
+    DETECTION_ONNX_PROVIDER: str = "CPUExecutionProvider"  # e.g. OpenVINOExecutionProvider
+    DETECTION_GATE_ENABLED: bool = True  # Skip inference on unchanged frames
+    DETECTION_GATE_THRESHOLD: float = 4.0  # Mean abs grayscale diff (0-255) that counts as a change
+    DETECTION_GATE_MAX_SKIP_SECONDS: float = 5.0  # Force a real inference at least this often
+    DETECTION_GATE_MAX_SESSIONS: int = 1000
+    DETECTION_GATE_IDLE_SECONDS: int = 300
+
+    # Maintenance scheduler (intervals of 0 disable a task)
+    MAINTENANCE_TOKEN_CLEANUP_SECONDS: float = 600
+    MAINTENANCE_CACHE_PURGE_SECONDS: float = 60
+    MAINTENANCE_DELETE_BATCH_SIZE: int = 1000  # Rows per DELETE statement and transaction
+    MAINTENANCE_MAX_BATCHES: int = 100  # Per run; the rest waits for the next one
+
+    # Evidence blob storage
+    BLOB_STORE: str = "local"  # "local" or "s3"
+    BLOB_LOCAL_DIR: str = "blobs"
+    BLOB_S3_BUCKET: str = ""
+    BLOB_S3_ENDPOINT_URL: str = ""  # Empty for AWS, or a MinIO/stand-in URL
+    BLOB_S3_ACCESS_KEY: str = ""
+    BLOB_S3_SECRET_KEY: str = ""
+    BLOB_S3_REGION: str = ""
+    BLOB_THUMBNAIL_SIZE: int = 320  # Longest side of evidence thumbnails, in pixels
+    BLOB_URL_TTL_SECONDS: int = 900  # Signed evidence URLs stay valid between this and twice this
+
     @property
     def DATABASE_URL(self) -> str:
         return f"postgresql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
+    @property
+    def DATABASE_REPLICA_URLS(self) -> List[str]:
+        return [url.strip() for url in self.DB_REPLICA_URLS.split(",") if url.strip()]
+
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+
     class Config:
         env_file = ".env"
         env_file_encoding = 'utf-8'
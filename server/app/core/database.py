@@ -1,10 +1,29 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from fastapi import Depends, Response
+from functools import lru_cache
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.concurrency import run_in_threadpool
 import os
 from dotenv import load_dotenv
-from typing import Generator
+from typing import Any, AsyncGenerator, Callable, Generator, TypeVar, Union
 from .config import settings
+from .metrics import (
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_CHECKOUT_SECONDS,
+    DB_POOL_OVERFLOW,
+    DB_POOL_TIMEOUTS,
+    DB_STATEMENT_TIMEOUTS,
+)
+
+T = TypeVar("T")
 
 load_dotenv()
 
@@ -12,16 +31,93 @@ Base = declarative_base()
 
 DATABASE_URL = settings.DATABASE_URL
 
+
+class _InstrumentedPool:
+    """Pool mixin timing each checkout, including the wait for a free slot.
+
+    Pool events only fire once a connection has been handed out, so the
+    wait itself is measured around `connect()`.
+    """
+    metrics_name = "default"
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            DB_POOL_TIMEOUTS.labels(self.metrics_name).inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.labels(self.metrics_name).observe(time.perf_counter() - started)
+
+    def recreate(self):
+        # engine.dispose() swaps in a new pool; keep its label
+        pool = super().recreate()
+        pool.metrics_name = self.metrics_name
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPool, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Export checked-out connections, overflow and statement timeouts for `engine`"""
+    engine.pool.metrics_name = name
+    # Counted here rather than read from pool.overflow(), which concurrent
+    # checkouts have already moved on by the time the event fires
+    open_connections = 0
+    lock = threading.Lock()
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKED_OUT.labels(name).inc()
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        DB_POOL_CHECKED_OUT.labels(name).dec()
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        nonlocal open_connections
+        with lock:
+            open_connections += 1
+            overflow = open_connections > engine.pool.size()
+        if overflow:
+            DB_POOL_OVERFLOW.labels(name).inc()
+
+    @event.listens_for(engine, "close")
+    @event.listens_for(engine, "detach")
+    def on_close(dbapi_connection, connection_record):
+        nonlocal open_connections
+        with lock:
+            open_connections -= 1
+
+    @event.listens_for(engine, "handle_error")
+    def on_error(context):
+        # 57014 is query_canceled, what statement_timeout raises
+        if getattr(context.original_exception, "pgcode", None) == "57014":
+            DB_STATEMENT_TIMEOUTS.labels(name).inc()
+
+
 engine = create_engine(
     DATABASE_URL,
-    pool_size=10,
-    max_overflow=5,
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
     pool_pre_ping=True,
-    pool_recycle=3600,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
     connect_args={
-        "connect_timeout": 5
+        "connect_timeout": 5,
+        "options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
     }
 )
+instrument_engine(engine, "api")
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -29,6 +125,72 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# Long reporting queries and maintenance jobs get their own small pool and a
+# longer statement timeout, so they cannot starve request handlers
+reporting_engine = create_engine(
+    DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.DB_REPORTING_POOL_SIZE,
+    max_overflow=settings.DB_REPORTING_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_pre_ping=True,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    connect_args={
+        "connect_timeout": 5,
+        "options": f"-c statement_timeout={settings.DB_REPORTING_STATEMENT_TIMEOUT_MS}"
+    }
+)
+instrument_engine(reporting_engine, "reporting")
+
+ReportingSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=reporting_engine
+)
+
+# Built only with DB_ASYNC, so asyncpg is not needed otherwise. The sync
+# engine above stays: startup, the write routes and scripts use it.
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL,
+    poolclass=InstrumentedAsyncQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_pre_ping=True,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    connect_args={
+        "timeout": 5,
+        "server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+    }
+) if settings.DB_ASYNC else None
+if async_engine is not None:
+    instrument_engine(async_engine.sync_engine, "api_async")
+
+# expire_on_commit=False: attributes read after a commit must not trigger
+# an implicit (blocking) refresh outside run_sync
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+@event.listens_for(Session, "after_begin")
+def _apply_statement_timeout(session, transaction, connection):
+    """Per-session override of the connection's statement timeout.
+
+    SET LOCAL ends with the transaction, so the connection goes back to the
+    pool with its default.
+    """
+    timeout_ms = session.info.get("statement_timeout_ms")
+    if timeout_ms is not None and connection.dialect.name == "postgresql":
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+
+def dialect_insert(db: Session):
+    """`insert` of the session's dialect, for ON CONFLICT clauses"""
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
+
 def get_db() -> Generator:
     db = SessionLocal()
     try:
@@ -36,12 +198,76 @@ def get_db() -> Generator:
     finally:
         db.close()
 
+def get_reporting_db() -> Generator:
+    db = ReportingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def statement_timeout(timeout_ms: int) -> Callable[..., Session]:
+    """Dependency: the request's sync session with its own statement timeout.
+
+    For route classes whose statements legitimately outlast
+    DB_STATEMENT_TIMEOUT_MS. It builds on get_db, so overrides of get_db
+    still apply.
+    """
+    def get_db_with_timeout(db: Session = Depends(get_db)) -> Session:
+        db.info["statement_timeout_ms"] = timeout_ms
+        return db
+    return get_db_with_timeout
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# What the API routers depend on; DB_ASYNC picks the session type
+get_db_session = get_async_db if settings.DB_ASYNC else get_db
+
+async def run_db(db: Union[Session, AsyncSession], function: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Call a sync service function with `db` as its first argument.
+
+    The services are written once against `Session`. With an AsyncSession
+    they run through `run_sync`, on the event loop with asyncpg doing the
+    I/O; with a Session they run on a worker thread as before.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(lambda session: function(session, *args, **kwargs))
+    return await run_in_threadpool(function, db, *args, **kwargs)
+
+async def run_in_session(function: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """run_db on a primary session of its own, for callers that seldom need one"""
+    if settings.DB_ASYNC:
+        async with AsyncSessionLocal() as db:
+            return await run_db(db, function, *args, **kwargs)
+
+    def call() -> T:
+        with SessionLocal() as db:
+            return function(db, *args, **kwargs)
+    return await run_in_threadpool(call)
+
+@lru_cache(maxsize=None)
+def _adapter(response_model: Any) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+def render(response_model: Any, content: Any) -> Response:
+    """Validate and serialize `content` as FastAPI would for `response_model`.
+
+    Called inside the function given to run_db, so the ORM-to-schema work
+    runs alongside the query (on the worker thread with a sync session)
+    instead of in FastAPI's response handling on the event loop. FastAPI
+    returns a Response as is.
+    """
+    adapter = _adapter(response_model)
+    body = adapter.dump_json(adapter.validate_python(content, from_attributes=True), by_alias=True)
+    return Response(body, media_type="application/json")
+
 def initialize_database():
     # Import all models here to ensure they're registered with SQLAlchemy
     from app.api.users.models import User, PasswordResetToken
     from app.api.roles.models import Role
     from app.api.classes.models import Class, UserClassAssociation
-    from app.api.exams.models import Exam
+    from app.api.exams.models import Exam, FraudIncident
     
     Base.metadata.create_all(bind=engine)
     
@@ -51,6 +277,4 @@ def initialize_database():
         from app.api.roles.services import create_default_roles
         create_default_roles(db)
     finally:
-        db.close()
-
-initialize_database()
\ No newline at end of file
+        db.close()
\ No newline at end of file
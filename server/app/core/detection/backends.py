@@ -0,0 +1,222 @@
+import ast
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from app.core.config import settings
+from app.core.detection.preprocess import letterbox
+
+# Per-frame raw predictions: (boxes xyxy in frame pixels, confidences, class ids)
+Prediction = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+_export_lock = threading.Lock()
+
+
+class DetectionBackend:
+    """Runs the detection model on a batch of frames"""
+
+    names: Dict[int, str] = {}
+    imgsz: int = 640  # Square model input size
+
+    def predict(
+        self,
+        frames: List[np.ndarray],
+        conf: Optional[float] = None,
+        classes: Optional[Sequence[int]] = None,
+    ) -> List[Prediction]:
+        """Predict on `frames`, dropping boxes at or below `conf` and outside `classes`"""
+        raise NotImplementedError
+
+
+class UltralyticsBackend(DetectionBackend):
+    """PyTorch inference through ultralytics.YOLO"""
+
+    def __init__(self, model_path: str):
+        from ultralytics import YOLO
+
+        self.model = YOLO(model_path)
+        self.names = self.model.names
+        imgsz = self.model.overrides.get("imgsz", 640)
+        self.imgsz = imgsz if isinstance(imgsz, int) else int(max(imgsz))
+
+    def predict(
+        self,
+        frames: List[np.ndarray],
+        conf: Optional[float] = None,
+        classes: Optional[Sequence[int]] = None,
+    ) -> List[Prediction]:
+        options = {}
+        if conf is not None:
+            options["conf"] = conf
+        if classes is not None:
+            options["classes"] = list(classes)
+        return [
+            (
+                result.boxes.xyxy.cpu().numpy(),
+                result.boxes.conf.cpu().numpy(),
+                result.boxes.cls.cpu().numpy(),
+            )
+            for result in self.model(frames, **options)
+        ]
+
+
+class OnnxBackend(DetectionBackend):
+    """CPU inference of an exported YOLO model through ONNX Runtime.
+
+    Pre- and post-processing mirror what ultralytics does for numpy input:
+    square letterbox, channel flip, NMS per class, boxes scaled back to the
+    frame, so results stay comparable with UltralyticsBackend.
+    """
+
+    def __init__(
+        self,
+        onnx_path: str,
+        intra_op_threads: int = 0,
+        inter_op_threads: int = 0,
+        provider: str = "CPUExecutionProvider",
+        conf: float = 0.25,
+        iou: float = 0.7,
+        max_det: int = 300,
+    ):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = inter_op_threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(onnx_path, options, providers=[provider])
+        self.input_name = self.session.get_inputs()[0].name
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names = ast.literal_eval(metadata["names"]) if "names" in metadata else {}
+        imgsz = ast.literal_eval(metadata["imgsz"]) if "imgsz" in metadata else [640, 640]
+        self.imgsz = imgsz if isinstance(imgsz, int) else int(max(imgsz))
+        self.conf = conf
+        self.iou = iou
+        self.max_det = max_det
+
+    def _letterbox(self, frame: np.ndarray) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+        if frame.shape[:2] == (self.imgsz, self.imgsz):
+            # Already letterboxed by FraudDetector
+            return frame, 1.0, (0, 0)
+        return letterbox(frame, self.imgsz)
+
+    def _postprocess(
+        self,
+        output: np.ndarray,
+        ratio: float,
+        pad: Tuple[int, int],
+        shape: Tuple[int, int],
+        conf: float,
+        classes: Optional[Sequence[int]],
+    ) -> Prediction:
+        predictions = output.T  # (anchors, 4 + classes)
+        scores = predictions[:, 4:]
+        class_ids = scores.argmax(axis=1)
+        confidences = scores[np.arange(len(scores)), class_ids]
+
+        keep = confidences > conf
+        if classes is not None:
+            keep &= np.isin(class_ids, classes)
+        if not keep.any():
+            empty = np.zeros((0,), dtype=np.float32)
+            return np.zeros((0, 4), dtype=np.float32), empty, empty
+
+        cxcywh = predictions[keep, :4]
+        confidences = confidences[keep]
+        class_ids = class_ids[keep]
+
+        xywh = cxcywh.copy()
+        xywh[:, :2] -= cxcywh[:, 2:] / 2
+        indices = cv2.dnn.NMSBoxesBatched(
+            xywh.tolist(), confidences.tolist(), class_ids.tolist(), conf, self.iou
+        )
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)[:self.max_det]
+
+        boxes = np.empty((len(indices), 4), dtype=np.float32)
+        boxes[:, :2] = xywh[indices, :2]
+        boxes[:, 2:] = xywh[indices, :2] + xywh[indices, 2:]
+        boxes -= np.array([pad[0], pad[1], pad[0], pad[1]], dtype=np.float32)
+        boxes /= ratio
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, shape[1])
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, shape[0])
+
+        return (
+            boxes,
+            confidences[indices].astype(np.float32),
+            class_ids[indices].astype(np.float32),
+        )
+
+    def predict(
+        self,
+        frames: List[np.ndarray],
+        conf: Optional[float] = None,
+        classes: Optional[Sequence[int]] = None,
+    ) -> List[Prediction]:
+        if conf is None:
+            conf = self.conf
+        letterboxed = [self._letterbox(frame) for frame in frames]
+        # ultralytics treats numpy input as BGR and flips it to RGB, do the same
+        batch = np.stack([canvas[..., ::-1] for canvas, _, _ in letterboxed])
+        batch = np.ascontiguousarray(batch.transpose(0, 3, 1, 2), dtype=np.float32) / 255.0
+
+        outputs = self.session.run(None, {self.input_name: batch})[0]
+        return [
+            self._postprocess(output, ratio, pad, frame.shape[:2], conf, classes)
+            for output, (_, ratio, pad), frame in zip(outputs, letterboxed, frames)
+        ]
+
+
+def export_onnx(model_path: str, onnx_path: str, imgsz: int = 640) -> str:
+    """One-time export of the PyTorch weights to ONNX with a dynamic batch axis"""
+    from ultralytics import YOLO
+
+    exported = YOLO(model_path).export(format="onnx", imgsz=imgsz, dynamic=True)
+    if os.path.abspath(exported) != os.path.abspath(onnx_path):
+        os.replace(exported, onnx_path)
+    return onnx_path
+
+
+def quantize_int8(onnx_path: str, int8_path: str) -> str:
+    """Dynamic INT8 weight quantization, keeping the class-name metadata"""
+    import onnx
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(onnx_path, int8_path, weight_type=QuantType.QUInt8)
+
+    source = onnx.load(onnx_path, load_external_data=False)
+    quantized = onnx.load(int8_path)
+    if not quantized.metadata_props:
+        quantized.metadata_props.extend(source.metadata_props)
+        onnx.save(quantized, int8_path)
+    return int8_path
+
+
+def load_backend(model_path: str) -> DetectionBackend:
+    """Build the backend selected by DETECTION_BACKEND, exporting on first use"""
+    if settings.DETECTION_BACKEND == "pytorch":
+        return UltralyticsBackend(model_path)
+
+    if settings.DETECTION_BACKEND != "onnx":
+        raise ValueError(f"Unknown detection backend: {settings.DETECTION_BACKEND}")
+
+    base_path = os.path.splitext(model_path)[0]
+    onnx_path = settings.DETECTION_ONNX_PATH or f"{base_path}.onnx"
+    with _export_lock:
+        if not os.path.exists(onnx_path):
+            export_onnx(model_path, onnx_path)
+        if settings.DETECTION_ONNX_INT8:
+            int8_path = f"{os.path.splitext(onnx_path)[0]}.int8.onnx"
+            if not os.path.exists(int8_path):
+                quantize_int8(onnx_path, int8_path)
+            onnx_path = int8_path
+
+    return OnnxBackend(
+        onnx_path,
+        intra_op_threads=settings.DETECTION_ONNX_INTRA_OP_THREADS,
+        inter_op_threads=settings.DETECTION_ONNX_INTER_OP_THREADS,
+        provider=settings.DETECTION_ONNX_PROVIDER,
+    )
@@ -0,0 +1,172 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from app.core.config import settings
+from app.core.metrics import (
+    DETECTION_BATCH_SIZE,
+    DETECTION_INFERENCE_PENDING,
+    DETECTION_QUEUE_DEPTH,
+    DETECTION_REJECTED,
+    record_detection,
+)
+from app.core.detection.executor import (
+    InferenceExecutor,
+    InferenceQueueFull,
+    inference_executor,
+)
+
+# (image_data, min_confidence, future, enqueued_at)
+_BatchItem = Tuple[Union[str, bytes], Optional[float], asyncio.Future, float]
+
+
+class BatchStats:
+    """Running occupancy numbers used to tune batch size against max wait"""
+
+    def __init__(self, max_batch_size: int):
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self.frames = 0
+        self.size_histogram: Dict[int, int] = {}
+        self.total_wait_ms = 0.0
+        self.total_inference_ms = 0.0
+        self.last_batch_size = 0
+
+    def record(self, size: int, wait_ms: float, inference_ms: float) -> None:
+        self.batches += 1
+        self.frames += size
+        self.size_histogram[size] = self.size_histogram.get(size, 0) + 1
+        self.total_wait_ms += wait_ms
+        self.total_inference_ms += inference_ms
+        self.last_batch_size = size
+
+    def as_dict(self) -> Dict[str, Any]:
+        batches = self.batches or 1
+        return {
+            "max_batch_size": self.max_batch_size,
+            "batches": self.batches,
+            "frames": self.frames,
+            "last_batch_size": self.last_batch_size,
+            "avg_batch_size": self.frames / batches,
+            "avg_occupancy": self.frames / batches / self.max_batch_size,
+            "avg_wait_ms": self.total_wait_ms / batches,
+            "avg_inference_ms": self.total_inference_ms / batches,
+            "size_histogram": dict(sorted(self.size_histogram.items())),
+        }
+
+
+class DetectionBatcher:
+    """Collects concurrent detection requests into batched model calls.
+
+    A batch is closed when it holds `max_batch_size` frames or when the
+    oldest frame has waited `max_wait_ms`. While every worker is busy,
+    frames keep accumulating in the queue so the next batch is fuller.
+    """
+
+    def __init__(
+        self,
+        executor: InferenceExecutor,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10,
+    ):
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.stats = BatchStats(self.max_batch_size)
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._collector: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _ensure_started(self) -> None:
+        if self._collector is None or self._collector.done():
+            self._queue = asyncio.Queue(
+                maxsize=self.executor.max_pending * self.max_batch_size
+            )
+            # One batch per worker, but never more than the executor admits:
+            # a batch past max_pending would fail whole instead of waiting
+            self._slots = asyncio.Semaphore(min(self.executor.workers, self.executor.max_pending))
+            self._collector = asyncio.create_task(self._collect())
+
+    async def submit(
+        self,
+        image_data: Union[str, bytes],
+        min_confidence: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait(
+                (image_data, min_confidence, future, time.perf_counter())
+            )
+        except asyncio.QueueFull:
+            DETECTION_REJECTED.inc()
+            raise InferenceQueueFull(f"{self.queue_depth} frames already queued")
+        return await future
+
+    async def stop(self) -> None:
+        if self._collector is not None:
+            self._collector.cancel()
+            self._collector = None
+        for task in list(self._inflight):
+            task.cancel()
+
+    async def _collect(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._slots.acquire()
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: List[_BatchItem]) -> None:
+        started = time.perf_counter()
+        try:
+            results = await self.executor.run(
+                "process_batch",
+                [image_data for image_data, _, _, _ in batch],
+                [min_confidence for _, min_confidence, _, _ in batch],
+            )
+        except Exception as e:
+            for _, _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+
+        finished = time.perf_counter()
+        self.stats.record(
+            size=len(batch),
+            wait_ms=(started - batch[0][3]) * 1000,
+            inference_ms=(finished - started) * 1000,
+        )
+        DETECTION_BATCH_SIZE.observe(len(batch))
+        for (_, _, future, _), result in zip(batch, results):
+            record_detection(result)
+            if not future.done():
+                future.set_result(result)
+
+
+detection_batcher = DetectionBatcher(
+    inference_executor,
+    max_batch_size=settings.DETECTION_BATCH_SIZE,
+    max_wait_ms=settings.DETECTION_BATCH_WAIT_MS,
+)
+DETECTION_QUEUE_DEPTH.set_function(lambda: detection_batcher.queue_depth)
+DETECTION_INFERENCE_PENDING.set_function(lambda: inference_executor.pending)
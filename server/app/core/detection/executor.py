@@ -0,0 +1,107 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Optional
+
+from app.core.config import settings
+
+# Each worker (thread or process) owns its own FraudDetector, the YOLO
+# predictor keeps per-call state and is not safe to share between threads.
+_local = threading.local()
+
+
+class InferenceQueueFull(Exception):
+    """Raised when the executor already has `max_pending` jobs in flight"""
+
+
+def _get_detector():
+    detector = getattr(_local, "detector", None)
+    if detector is None:
+        from app.core.detection.fraud_detector import FraudDetector
+        detector = FraudDetector()
+        _local.detector = detector
+    return detector
+
+
+def _init_worker() -> None:
+    """Load the model as soon as a worker process starts"""
+    _get_detector()
+
+
+def _call_detector(method: str, *args: Any) -> Any:
+    return getattr(_get_detector(), method)(*args)
+
+
+def _warm_up_worker(barrier: Optional[threading.Barrier]) -> None:
+    try:
+        _get_detector().warm_up()
+    finally:
+        if barrier is not None:
+            # Hold this thread until every other one has taken a warm-up job too
+            barrier.wait()
+
+
+class InferenceExecutor:
+    def __init__(self, kind: str = "thread", workers: int = 2, max_pending: int = 8):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown inference executor kind: {kind}")
+        self.kind = kind
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.ready = False
+        self._pool: Optional[Executor] = None
+
+    def start(self) -> None:
+        if self._pool is not None:
+            return
+        if self.kind == "process":
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        else:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="inference",
+            )
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        self.ready = False
+
+    async def warm_up(self) -> None:
+        """Load the model and run a first inference on every worker"""
+        self.start()
+        loop = asyncio.get_running_loop()
+        barrier = threading.Barrier(self.workers) if self.kind == "thread" else None
+        await asyncio.gather(*(
+            loop.run_in_executor(self._pool, _warm_up_worker, barrier)
+            for _ in range(self.workers)
+        ))
+        self.ready = True
+
+    async def run(self, method: str, *args: Any) -> Any:
+        """Run a FraudDetector method on a worker without blocking the event loop"""
+        if self.pending >= self.max_pending:
+            raise InferenceQueueFull(
+                f"{self.pending} detection jobs already pending"
+            )
+        self.start()
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, _call_detector, method, *args)
+        finally:
+            self.pending -= 1
+
+
+inference_executor = InferenceExecutor(
+    kind=settings.DETECTION_EXECUTOR,
+    workers=settings.DETECTION_WORKERS,
+    max_pending=settings.DETECTION_MAX_PENDING,
+)
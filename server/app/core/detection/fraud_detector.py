@@ -1,9 +1,16 @@
 import cv2
 import numpy as np
-from ultralytics import YOLO
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple, Union
 import base64
+import time
 from datetime import datetime
+from app.core.detection.backends import Prediction, load_backend
+from app.core.detection.preprocess import (
+    FrameGeometry,
+    LetterboxBuffers,
+    decode_frame,
+    restore_boxes,
+)
 
 class FraudDetector:
     def __init__(self):
@@ -14,77 +21,191 @@ class FraudDetector:
         self._load_model()
 
     def _load_model(self):
-        """Load the YOLO model and class names"""
-        self.model = YOLO(self.model_path)
+        """Load the detection backend and class names"""
+        self.model = load_backend(self.model_path)
         self.class_names = self.model.names
+        # Resolved once so post-processing compares ids, not strings
+        self.cheating_class_ids = np.array(
+            [class_id for class_id, name in self.class_names.items() if name == "cheating"],
+            dtype=np.float32
+        )
+        self.letterbox = LetterboxBuffers(self.model.imgsz)
         print(f"Model loaded with classes: {self.class_names}")
 
-    def process_image(self, image_data: str) -> Dict[str, Any]:
-        
-        if not image_data or not isinstance(image_data, str):
-            return {
-                "detections": [],
-                "is_fraud": False,
-                "timestamp": datetime.now().isoformat(),
-                "error": "Invalid image data"
-            }
-        
-        try:
-            
+    def warm_up(self) -> None:
+        """Run one inference on a blank frame so the first real request isn't slow"""
+        blank = np.full((self.model.imgsz, self.model.imgsz, 3), 114, dtype=np.uint8)
+        self.model.predict([blank], conf=self.min_confidence, classes=self.cheating_class_ids.tolist())
+
+    def _error_result(self, error: str, stage: str) -> Dict[str, Any]:
+        return {
+            "detections": [],
+            "is_fraud": False,
+            "timestamp": datetime.now().isoformat(),
+            "error": error,
+            "error_stage": stage
+        }
+
+    def _decode_image(
+        self,
+        image_data: Union[str, bytes]
+    ) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+        """Decode a JPEG, raw bytes or base64 string, into a BGR frame.
+
+        The frame is decoded at a reduced size when it is larger than the
+        model input; the reduction factor and original shape come back too.
+        """
+        if isinstance(image_data, (bytes, bytearray, memoryview)):
+            if not len(image_data):
+                raise ValueError("Empty image data")
+            # Wraps the request body buffer directly, no intermediate copy
+            nparr = np.frombuffer(image_data, np.uint8)
+        else:
+            if not image_data or not isinstance(image_data, str):
+                raise ValueError("Invalid image data")
+
             if not image_data.strip():
                 raise ValueError("Empty image data")
-            
+
             # Add padding if needed (base64 requires length divisible by 4)
             padding = len(image_data) % 4
             if padding:
                 image_data += "=" * (4 - padding)
+
             # Convert base64 to numpy array
-            
-            
             nparr = np.frombuffer(base64.b64decode(image_data), np.uint8)
-            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
-            if frame is None:
-                return {
+
+        frame, scale, shape = decode_frame(nparr, self.model.imgsz)
+        if frame is None:
+            raise ValueError("Could not decode image")
+
+        return frame, scale, shape
+
+    def _preprocess(
+        self,
+        frame: np.ndarray,
+        scale: float,
+        shape: Tuple[int, int],
+        slot: int
+    ) -> Tuple[np.ndarray, FrameGeometry]:
+        """Letterbox into this worker's reusable RGB input buffer for `slot`"""
+        canvas, ratio, pad = self.letterbox(frame, slot)
+        return canvas, (ratio, pad, scale, shape)
+
+    def _build_result(
+        self,
+        prediction: Prediction,
+        min_confidence: Optional[float] = None,
+        geometry: Optional[FrameGeometry] = None
+    ) -> Dict[str, Any]:
+        """Turn one frame's model output into the detection response payload.
+
+        Rows are filtered with one vectorized mask; only surviving boxes are
+        mapped back to frame coordinates and turned into dicts.
+        """
+        if min_confidence is None:
+            min_confidence = self.min_confidence
+
+        boxes, confidences, class_ids = prediction
+        keep = (confidences > min_confidence) & np.isin(class_ids, self.cheating_class_ids)
+        if not keep.any():
+            return {
                 "detections": [],
                 "is_fraud": False,
-                "timestamp": datetime.now().isoformat(),
-                "error": "Could not decode image"
-                }
-                
-            
-            # Run detection
-            results = self.model(frame)
-            
-            detections = []
-            is_fraud = False
-            
-            for result in results:
-                boxes = result.boxes.xyxy.cpu().numpy()
-                confidences = result.boxes.conf.cpu().numpy()
-                class_ids = result.boxes.cls.cpu().numpy()
-                
-                for box, confidence, class_id in zip(boxes, confidences, class_ids):
-                    if confidence > self.min_confidence and self.class_names[int(class_id)] == "cheating":
-                        is_fraud = True
-                        detections.append({
-                            "class_id": int(class_id),
-                            "class_name": self.class_names[int(class_id)],
-                            "confidence": float(confidence),
-                            "bbox": box.tolist()  # Convert numpy array to list
-                        })
-            
-            return {
-                "detections": detections,
-                "is_fraud": is_fraud,
                 "timestamp": datetime.now().isoformat()
             }
-            
-        except Exception as e:
-            return {
-                "detections": [],
-                "is_fraud": False,
-                "timestamp": datetime.now().isoformat(),
-                "error": str(e)
-            }
\ No newline at end of file
+
+        boxes = boxes[keep]
+        if geometry is not None:
+            boxes = restore_boxes(boxes, geometry)
+        detections = [
+            {
+                "class_id": class_id,
+                "class_name": self.class_names[class_id],
+                "confidence": confidence,
+                "bbox": bbox
+            }
+            for class_id, confidence, bbox in zip(
+                class_ids[keep].astype(int).tolist(),
+                confidences[keep].tolist(),
+                boxes.tolist()
+            )
+        ]
+
+        return {
+            "detections": detections,
+            "is_fraud": True,
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def process_image(
+        self,
+        image_data: Union[str, bytes],
+        min_confidence: Optional[float] = None
+    ) -> Dict[str, Any]:
+        return self.process_batch([image_data], [min_confidence])[0]
+
+    def process_batch(
+        self,
+        images: List[Union[str, bytes]],
+        min_confidences: Optional[List[Optional[float]]] = None
+    ) -> List[Dict[str, Any]]:
+        """Run a single YOLO call over several frames.
+
+        Frames that fail to decode get an error result and are left out of
+        the batch, so one bad upload doesn't fail its neighbours.
+        `min_confidences` optionally overrides the threshold per frame.
+        """
+        if min_confidences is None:
+            min_confidences = [None] * len(images)
+        results: List[Dict[str, Any]] = [None] * len(images)
+        timings: List[Dict[str, float]] = [{} for _ in images]
+        frames = []
+        geometries = []
+        indices = []
+
+        for i, image_data in enumerate(images):
+            started = time.perf_counter()
+            try:
+                frame, scale, shape = self._decode_image(image_data)
+            except Exception as e:
+                results[i] = self._error_result(str(e), "decode")
+                continue
+            decoded = time.perf_counter()
+            canvas, geometry = self._preprocess(frame, scale, shape, len(frames))
+            frames.append(canvas)
+            geometries.append(geometry)
+            timings[i]["decode"] = decoded - started
+            timings[i]["preprocess"] = time.perf_counter() - decoded
+            indices.append(i)
+
+        if frames:
+            # Thresholds and the class filter go into the model call, so
+            # discarded boxes never leave the backend
+            thresholds = [
+                self.min_confidence if threshold is None else threshold
+                for threshold in min_confidences
+            ]
+            started = time.perf_counter()
+            try:
+                predictions = self.model.predict(
+                    frames,
+                    conf=min(thresholds[i] for i in indices),
+                    classes=self.cheating_class_ids.tolist()
+                )
+            except Exception as e:
+                for i in indices:
+                    results[i] = self._error_result(str(e), "inference")
+                predictions = []
+            inference = time.perf_counter() - started
+
+            for i, geometry, prediction in zip(indices, geometries, predictions):
+                started = time.perf_counter()
+                results[i] = self._build_result(prediction, thresholds[i], geometry)
+                # Inference time is the whole batch call, shared by its frames
+                timings[i]["inference"] = inference
+                timings[i]["postprocess"] = time.perf_counter() - started
+
+        for result, timing in zip(results, timings):
+            result["timings"] = timing
+        return results
@@ -0,0 +1,152 @@
+import base64
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+import cv2
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.metrics import DETECTION_SKIPPED
+
+SIGNATURE_SIZE = 32
+
+
+def frame_signature(image_data: Union[str, bytes]) -> Optional[np.ndarray]:
+    """Tiny grayscale thumbnail used to tell whether the scene changed.
+
+    IMREAD_REDUCED_GRAYSCALE_8 lets libjpeg skip most of the IDCT work, so
+    this costs a fraction of a full decode.
+    """
+    try:
+        if isinstance(image_data, str):
+            padding = len(image_data) % 4
+            if padding:
+                image_data += "=" * (4 - padding)
+            image_data = base64.b64decode(image_data)
+        small = cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    except Exception:
+        return None
+    if small is None:
+        return None
+    return cv2.resize(
+        small, (SIGNATURE_SIZE, SIGNATURE_SIZE), interpolation=cv2.INTER_AREA
+    ).astype(np.float32)
+
+
+class FrameGate:
+    """Reuses the last detection while a stream's frames stay unchanged.
+
+    Frames are compared with the frame that was last sent to the model, not
+    the previous frame, so slow drift still triggers inference. A fresh
+    inference is forced every `max_skip_seconds` regardless.
+    """
+
+    def __init__(self, threshold: float, max_skip_seconds: float):
+        self.threshold = threshold
+        self.max_skip_seconds = max_skip_seconds
+        self.frames = 0
+        self.skipped = 0
+        self.last_seen = time.monotonic()
+        self._signature: Optional[np.ndarray] = None
+        self._result: Optional[Dict[str, Any]] = None
+        self._inferred_at = 0.0
+
+    @property
+    def skip_rate(self) -> float:
+        return self.skipped / self.frames if self.frames else 0.0
+
+    def reset(self) -> None:
+        self._signature = None
+        self._result = None
+
+    def check(self, signature: Optional[np.ndarray]) -> Optional[Dict[str, Any]]:
+        """Return the cached result if this frame can skip inference"""
+        now = time.monotonic()
+        self.frames += 1
+        self.last_seen = now
+        if (
+            signature is None
+            or self._result is None
+            or now - self._inferred_at >= self.max_skip_seconds
+        ):
+            return None
+        if float(np.mean(np.abs(signature - self._signature))) > self.threshold:
+            return None
+        self.skipped += 1
+        return self._result
+
+    def update(self, signature: Optional[np.ndarray], result: Dict[str, Any]) -> None:
+        if signature is None or result.get("error"):
+            self.reset()
+            return
+        self._signature = signature
+        self._result = result
+        self._inferred_at = time.monotonic()
+
+    async def detect(
+        self,
+        image_data: Union[str, bytes],
+        submit: Callable[[Union[str, bytes]], Awaitable[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        signature = await run_in_threadpool(frame_signature, image_data)
+        cached = self.check(signature)
+        if cached is not None:
+            DETECTION_SKIPPED.inc()
+            return {
+                **cached,
+                "timestamp": datetime.now().isoformat(),
+                "timings": {},
+                "skipped": True,
+                "skip_rate": self.skip_rate,
+            }
+
+        result = await submit(image_data)
+        self.update(signature, result)
+        return {**result, "skipped": False, "skip_rate": self.skip_rate}
+
+
+class GateRegistry:
+    """Frame gates for HTTP clients, keyed by the client's session id"""
+
+    def __init__(self, max_sessions: int, idle_seconds: float):
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self._gates: "OrderedDict[str, FrameGate]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._gates)
+
+    def get(self, session_id: str) -> FrameGate:
+        gate = self._gates.get(session_id)
+        if gate is None:
+            self.purge()
+            while len(self._gates) >= self.max_sessions:
+                self._gates.popitem(last=False)
+            gate = self._gates[session_id] = new_gate()
+        else:
+            self._gates.move_to_end(session_id)
+        return gate
+
+    def purge(self) -> int:
+        """Drop gates of sessions that stopped sending frames"""
+        cutoff = time.monotonic() - self.idle_seconds
+        stale = [key for key, gate in self._gates.items() if gate.last_seen < cutoff]
+        for key in stale:
+            del self._gates[key]
+        return len(stale)
+
+
+def new_gate() -> FrameGate:
+    return FrameGate(
+        threshold=settings.DETECTION_GATE_THRESHOLD,
+        max_skip_seconds=settings.DETECTION_GATE_MAX_SKIP_SECONDS,
+    )
+
+
+gate_registry = GateRegistry(
+    max_sessions=settings.DETECTION_GATE_MAX_SESSIONS,
+    idle_seconds=settings.DETECTION_GATE_IDLE_SECONDS,
+)
@@ -0,0 +1,141 @@
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Geometry needed to map boxes from the letterboxed model input back to the
+# original frame: (letterbox ratio, (left, top) padding, decode reduction
+# factor, original (height, width))
+FrameGeometry = Tuple[float, Tuple[int, int], float, Tuple[int, int]]
+
+_REDUCED_COLOR = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+# SOFn markers carry the frame size; C4 (DHT), C8 (JPG) and CC (DAC) don't
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+PAD_VALUE = 114
+
+
+def jpeg_size(data: np.ndarray) -> Optional[Tuple[int, int]]:
+    """(width, height) from the JPEG header, without decoding the image"""
+    buf = memoryview(data)
+    n = len(buf)
+    if n < 4 or buf[0] != 0xFF or buf[1] != 0xD8:
+        return None
+
+    i = 2
+    while i + 9 < n:
+        if buf[i] != 0xFF:
+            return None
+        marker = buf[i + 1]
+        if marker == 0xFF:
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            i += 2
+            continue
+        if marker in _SOF_MARKERS:
+            height = (buf[i + 5] << 8) | buf[i + 6]
+            width = (buf[i + 7] << 8) | buf[i + 8]
+            return width, height
+        i += 2 + ((buf[i + 2] << 8) | buf[i + 3])
+    return None
+
+
+def reduction_factor(width: int, height: int, target_size: int) -> int:
+    """Largest libjpeg scale-down that still covers the model input size"""
+    longest = max(width, height)
+    for factor in (8, 4, 2):
+        if longest // factor >= target_size:
+            return factor
+    return 1
+
+
+def decode_frame(data: np.ndarray, target_size: int) -> Tuple[Optional[np.ndarray], float, Tuple[int, int]]:
+    """Decode a JPEG at the smallest size that is still >= target_size.
+
+    Returns the BGR frame, the factor it was scaled down by and the
+    original (height, width). IMREAD_REDUCED_* makes libjpeg skip IDCT
+    work, so a 1080p frame costs about a quarter of a full decode.
+    """
+    size = jpeg_size(data)
+    factor = reduction_factor(size[0], size[1], target_size) if size else 1
+    frame = cv2.imdecode(data, _REDUCED_COLOR[factor])
+    if frame is None:
+        return None, 1.0, (0, 0)
+    if size is None:
+        return frame, 1.0, frame.shape[:2]
+    width, height = size
+    return frame, width / frame.shape[1], (height, width)
+
+
+def letterbox_geometry(shape: Tuple[int, int], size: int) -> Tuple[float, Tuple[int, int], Tuple[int, int]]:
+    height, width = shape
+    ratio = min(size / height, size / width)
+    new_w, new_h = int(round(width * ratio)), int(round(height * ratio))
+    left = int(round((size - new_w) / 2 - 0.1))
+    top = int(round((size - new_h) / 2 - 0.1))
+    return ratio, (left, top), (new_w, new_h)
+
+
+def letterbox(frame: np.ndarray, size: int) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """Resize onto a new square canvas, same padding rules as ultralytics"""
+    ratio, (left, top), (new_w, new_h) = letterbox_geometry(frame.shape[:2], size)
+    canvas = np.full((size, size, 3), PAD_VALUE, dtype=np.uint8)
+    cv2.resize(
+        frame,
+        (new_w, new_h),
+        dst=canvas[top:top + new_h, left:left + new_w],
+        interpolation=cv2.INTER_LINEAR,
+    )
+    return canvas, ratio, (left, top)
+
+
+class LetterboxBuffers:
+    """Preallocated model-input canvases, one per batch slot.
+
+    A detector owns one of these, so each worker reuses the same few
+    size x size buffers instead of allocating per frame. The BGR->RGB
+    conversion is done in place on the resized region.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._buffers: List[np.ndarray] = []
+        self._regions: List[Optional[Tuple[int, int, int, int]]] = []
+
+    def __call__(self, frame: np.ndarray, slot: int) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+        while len(self._buffers) <= slot:
+            self._buffers.append(np.full((self.size, self.size, 3), PAD_VALUE, dtype=np.uint8))
+            self._regions.append(None)
+
+        canvas = self._buffers[slot]
+        ratio, (left, top), (new_w, new_h) = letterbox_geometry(frame.shape[:2], self.size)
+        region = (left, top, new_w, new_h)
+        if self._regions[slot] != region:
+            # Only repaint the padding when the frame geometry changes
+            canvas.fill(PAD_VALUE)
+            self._regions[slot] = region
+
+        target = canvas[top:top + new_h, left:left + new_w]
+        cv2.resize(frame, (new_w, new_h), dst=target, interpolation=cv2.INTER_LINEAR)
+        cv2.cvtColor(target, cv2.COLOR_BGR2RGB, dst=target)
+        return canvas, ratio, (left, top)
+
+
+def restore_boxes(boxes: np.ndarray, geometry: FrameGeometry) -> np.ndarray:
+    """Map xyxy boxes from model-input pixels back to original frame pixels"""
+    ratio, (left, top), scale, (height, width) = geometry
+    if not len(boxes):
+        return boxes
+    boxes = boxes.astype(np.float32, copy=True)
+    boxes -= np.array([left, top, left, top], dtype=np.float32)
+    boxes *= scale / ratio
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, width)
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, height)
+    return boxes
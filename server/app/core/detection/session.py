@@ -0,0 +1,76 @@
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from app.core.detection.gating import FrameGate
+
+
+class DetectionSession:
+    """In-memory state of one webcam stream, kept for the life of its WebSocket.
+
+    Incoming frames go into a single latest-frame slot: when inference falls
+    behind, the older frame is dropped instead of queued, so the result the
+    client gets back is never more than one frame stale.
+    """
+
+    def __init__(
+        self,
+        exam_id: int,
+        min_confidence: Optional[float] = None,
+        max_incidents: int = 50,
+        gate: Optional[FrameGate] = None,
+    ):
+        self.exam_id = exam_id
+        self.min_confidence = min_confidence
+        self.gate = gate
+        self.incidents: Deque[Dict[str, Any]] = deque(maxlen=max_incidents)
+        self.frames_received = 0
+        self.frames_processed = 0
+        self.frames_dropped = 0
+        self._latest: Optional[bytes] = None
+        self._frame_ready = asyncio.Event()
+
+    def offer(self, frame: bytes) -> None:
+        if self._latest is not None:
+            self.frames_dropped += 1
+        self._latest = frame
+        self.frames_received += 1
+        self._frame_ready.set()
+
+    async def next_frame(self) -> bytes:
+        await self._frame_ready.wait()
+        self._frame_ready.clear()
+        frame, self._latest = self._latest, None
+        return frame
+
+    def record(self, result: Dict[str, Any]) -> None:
+        self.frames_processed += 1
+        # A skipped frame repeats the previous result, it is not a new incident
+        if result.get("is_fraud") and not result.get("skipped"):
+            self.incidents.append({
+                "timestamp": result["timestamp"],
+                "detections": result["detections"],
+            })
+
+    def configure(self, options: Dict[str, Any]) -> None:
+        if "min_confidence" in options:
+            min_confidence = options["min_confidence"]
+            if min_confidence is not None:
+                min_confidence = float(min_confidence)
+                if not 0 <= min_confidence <= 1:
+                    raise ValueError("min_confidence must be between 0 and 1")
+            self.min_confidence = min_confidence
+            if self.gate is not None:
+                # The cached result was filtered with the old threshold
+                self.gate.reset()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "exam_id": self.exam_id,
+            "min_confidence": self.min_confidence,
+            "frames_received": self.frames_received,
+            "frames_processed": self.frames_processed,
+            "frames_dropped": self.frames_dropped,
+            "incidents": len(self.incidents),
+            "skip_rate": self.gate.skip_rate if self.gate is not None else None,
+        }
@@ -1,11 +1,290 @@
+import asyncio
+import logging
+import os
+import random
 import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from typing import Dict, List, Optional, Set, Tuple
 from app.core.config import settings
-from jinja2 import Environment, FileSystemLoader
-import os
+from app.core.metrics import EMAIL_FAILED, EMAIL_QUEUE_DEPTH, EMAIL_RETRIED, EMAIL_SENT
+from jinja2 import Environment, FileSystemLoader, Template
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates")
+
+env = Environment(loader=FileSystemLoader(TEMPLATE_DIR), autoescape=True)
+_templates: Dict[str, Template] = {}
+
+
+def load_templates() -> None:
+    """Compile every email template once, at startup instead of on first send"""
+    for name in env.list_templates(extensions=["html"]):
+        _templates[name] = env.get_template(name)
+
+
+def render(template: str, context: dict) -> str:
+    if template not in _templates:
+        _templates[template] = env.get_template(template)
+    return _templates[template].render(**context)
+
+
+@dataclass
+class OutgoingEmail:
+    recipient: str
+    subject: str
+    html: str
+    attempts: int = 0
+
+    def as_mime(self) -> MIMEMultipart:
+        msg = MIMEMultipart()
+        msg['From'] = f"{settings.EMAILS_FROM_NAME} <{settings.EMAILS_FROM_EMAIL}>"
+        msg['To'] = self.recipient
+        msg['Subject'] = self.subject
+        msg.attach(MIMEText(self.html, "html"))
+        return msg
+
+
+def _is_permanent(error: Exception) -> bool:
+    """5xx replies will not change on retry; everything else might"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+
+class SMTPConnectionPool:
+    """Authenticated SMTP connections reused across messages.
+
+    TLS and login happen once per connection instead of once per email.
+    A connection idle for longer than `idle_seconds` is checked with NOOP
+    before reuse, since servers drop idle clients.
+    """
+
+    def __init__(self, size: int = 2, idle_seconds: float = 30):
+        self.size = size
+        self.idle_seconds = idle_seconds
+        self._idle: List[Tuple[smtplib.SMTP, float]] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> smtplib.SMTP:
+        if settings.SMTP_TLS == "ssl":
+            server = smtplib.SMTP_SSL(settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT)
+        else:
+            server = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT)
+            if settings.SMTP_TLS == "starttls":
+                server.starttls()
+        if settings.SMTP_USER:
+            server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+        return server
+
+    def acquire(self) -> smtplib.SMTP:
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                server, released_at = self._idle.pop()
+            if time.monotonic() - released_at < self.idle_seconds:
+                return server
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except OSError:
+                pass
+            self._close(server)
+        return self._connect()
+
+    def release(self, server: smtplib.SMTP) -> None:
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append((server, time.monotonic()))
+                return
+        self._close(server)
+
+    def discard(self, server: smtplib.SMTP) -> None:
+        self._close(server)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server, _ in idle:
+            self._close(server)
+
+    @staticmethod
+    def _close(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except OSError:
+            server.close()
+
+
+class EmailQueue:
+    """Outbound email queue drained by background workers.
+
+    Each worker takes up to `batch_size` queued messages and sends them over
+    one pooled connection in a thread, so the event loop never waits on
+    SMTP. Transient failures are retried with exponential backoff and
+    jitter, up to `max_attempts` per message; 5xx replies are not retried.
+    """
+
+    def __init__(
+        self,
+        pool: SMTPConnectionPool,
+        workers: int = 2,
+        batch_size: int = 20,
+        max_size: int = 1000,
+        max_attempts: int = 5,
+        retry_base_seconds: float = 2,
+    ):
+        self.pool = pool
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.max_size = max_size
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._tasks: List[asyncio.Task] = []
+        self._retries: Set[asyncio.TimerHandle] = set()
+
+    @property
+    def started(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self) -> None:
+        if self.started:
+            return
+        load_templates()
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="smtp")
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: float = 10) -> None:
+        """Give queued messages `timeout` seconds to go out, then stop"""
+        if not self.started:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Stopping with %d emails still queued", self._queue.qsize())
+        for handle in self._retries:
+            handle.cancel()
+        if self._retries:
+            logger.warning("Dropping %d emails waiting for a retry", len(self._retries))
+        self._retries.clear()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._executor.shutdown(wait=True)
+        self.pool.close()
+
+    def submit(self, message: OutgoingEmail) -> None:
+        """Queue a message; callable from the event loop or from a worker thread"""
+        if not self.started:
+            # Scripts and CLI tools run without the app lifespan: send inline, no retry
+            for _, error in self._send_batch([message]):
+                EMAIL_FAILED.inc()
+                logger.error("Email to %s failed: %s", message.recipient, error)
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._put(message)
+        else:
+            self._loop.call_soon_threadsafe(self._put, message)
+
+    def _put(self, message: OutgoingEmail) -> None:
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            EMAIL_FAILED.inc()
+            logger.error("Email queue full, dropping message to %s", message.recipient)
+            return
+        EMAIL_QUEUE_DEPTH.set(self._queue.qsize())
+
+    async def _work(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            EMAIL_QUEUE_DEPTH.set(self._queue.qsize())
+            try:
+                failed = await loop.run_in_executor(self._executor, self._send_batch, batch)
+                for message, error in failed:
+                    self._retry_later(message, error)
+            except Exception:
+                logger.exception("Email worker failed on a batch of %d", len(batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _send_batch(self, batch: List[OutgoingEmail]) -> List[Tuple[OutgoingEmail, Exception]]:
+        """Send over one connection; returns the messages that failed"""
+        failed: List[Tuple[OutgoingEmail, Exception]] = []
+        try:
+            server = self.pool.acquire()
+        except OSError as e:
+            return [(message, e) for message in batch]
+
+        for i, message in enumerate(batch):
+            try:
+                server.send_message(message.as_mime())
+                EMAIL_SENT.inc()
+            except smtplib.SMTPResponseException as e:
+                # The server refused this message but the session is still usable
+                failed.append((message, e))
+                try:
+                    server.rset()
+                except OSError:
+                    self.pool.discard(server)
+                    return failed + [(message, e) for message in batch[i + 1:]]
+            except OSError as e:
+                # Disconnected or timed out (SMTPException is an OSError too);
+                # the rest of the batch goes back for a retry
+                self.pool.discard(server)
+                return failed + [(message, e) for message in batch[i:]]
+        self.pool.release(server)
+        return failed
+
+    def _retry_later(self, message: OutgoingEmail, error: Exception) -> None:
+        message.attempts += 1
+        if _is_permanent(error) or message.attempts >= self.max_attempts or not self.started:
+            EMAIL_FAILED.inc()
+            logger.error("Giving up on email to %s after %d attempts: %s", message.recipient, message.attempts, error)
+            return
+        EMAIL_RETRIED.inc()
+        delay = self.retry_base_seconds * 2 ** (message.attempts - 1) * random.uniform(0.5, 1.5)
+        logger.warning("Email to %s failed (%s), retrying in %.1fs", message.recipient, error, delay)
+
+        def requeue() -> None:
+            self._retries.discard(handle)
+            self._put(message)
+
+        handle = self._loop.call_later(delay, requeue)
+        self._retries.add(handle)
+
+
+email_queue = EmailQueue(
+    SMTPConnectionPool(size=settings.SMTP_POOL_SIZE, idle_seconds=settings.SMTP_IDLE_SECONDS),
+    workers=settings.SMTP_POOL_SIZE,
+    batch_size=settings.EMAIL_BATCH_SIZE,
+    max_size=settings.EMAIL_QUEUE_MAX_SIZE,
+    max_attempts=settings.EMAIL_MAX_ATTEMPTS,
+    retry_base_seconds=settings.EMAIL_RETRY_BASE_SECONDS,
+)
 
-env = Environment(loader=FileSystemLoader("app/templates"))
 
 def send_email(
     recipient: str,
@@ -13,21 +292,8 @@ def send_email(
     template: str,
     context: dict
 ) -> None:
-    """Send email using SMTP"""
-    template = env.get_template(template)
-    html_content = template.render(**context)
-    
-    msg = MIMEMultipart()
-    msg['From'] = f"{settings.EMAILS_FROM_NAME} <{settings.EMAILS_FROM_EMAIL}>"
-    msg['To'] = recipient
-    msg['Subject'] = subject
-    
-    msg.attach(MIMEText(html_content, "html"))
-    
-    with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-        server.starttls()
-        server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-        server.send_message(msg)
+    """Render an email and queue it for the background sender"""
+    email_queue.submit(OutgoingEmail(recipient, subject, render(template, context)))
 
 def send_reset_password_email(email: str, token: str) -> None:
     """Send password reset email"""
@@ -40,4 +306,4 @@ def send_reset_password_email(email: str, token: str) -> None:
             "reset_link": reset_link,
             "expiry_minutes": settings.PASSWORD_RESET_TOKEN_EXPIRE_MINUTES
         }
-    )
\ No newline at end of file
+    )
@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.metrics import MAINTENANCE_FAILURES, MAINTENANCE_ROWS, MAINTENANCE_RUN_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MaintenanceTask:
+    name: str
+    interval_seconds: float
+    run: Callable[[], int]  # Returns the number of rows or entries removed
+    blocking: bool = True  # Blocking tasks (database work) run in a thread; others on the loop
+    last_run_at: Optional[float] = None
+    last_duration_seconds: Optional[float] = None
+    last_rows: Optional[int] = None
+    last_error: Optional[str] = None
+
+
+class MaintenanceScheduler:
+    """Runs housekeeping tasks periodically inside the app lifespan.
+
+    Each task has its own loop and interval, so a slow task never delays
+    the others, and a failing one is logged and retried at its next tick.
+    """
+
+    def __init__(self):
+        self.tasks: Dict[str, MaintenanceTask] = {}
+        self._loops: List[asyncio.Task] = []
+
+    def add(self, name: str, interval_seconds: float, run: Callable[[], int], blocking: bool = True) -> None:
+        self.tasks[name] = MaintenanceTask(name, interval_seconds, run, blocking)
+
+    def start(self) -> None:
+        if self._loops:
+            return
+        self._loops = [
+            asyncio.create_task(self._loop(task))
+            for task in self.tasks.values()
+            if task.interval_seconds > 0
+        ]
+
+    async def stop(self) -> None:
+        for loop in self._loops:
+            loop.cancel()
+        await asyncio.gather(*self._loops, return_exceptions=True)
+        self._loops = []
+
+    async def run_once(self, task: MaintenanceTask) -> None:
+        started = time.perf_counter()
+        try:
+            rows = await run_in_threadpool(task.run) if task.blocking else task.run()
+        except Exception as e:
+            MAINTENANCE_FAILURES.labels(task.name).inc()
+            task.last_error = str(e)
+            logger.exception("Maintenance task %s failed", task.name)
+            return
+        finally:
+            task.last_duration_seconds = time.perf_counter() - started
+            task.last_run_at = time.time()
+            MAINTENANCE_RUN_SECONDS.labels(task.name).observe(task.last_duration_seconds)
+        task.last_rows = rows
+        task.last_error = None
+        MAINTENANCE_ROWS.labels(task.name).inc(rows)
+
+    async def _loop(self, task: MaintenanceTask) -> None:
+        while True:
+            await self.run_once(task)
+            await asyncio.sleep(task.interval_seconds)
+
+    def status(self) -> Dict[str, Dict]:
+        return {
+            task.name: {
+                "interval_seconds": task.interval_seconds,
+                "last_run_at": task.last_run_at,
+                "last_duration_seconds": task.last_duration_seconds,
+                "last_rows": task.last_rows,
+                "last_error": task.last_error,
+            }
+            for task in self.tasks.values()
+        }
+
+
+def _cleanup_password_reset_tokens() -> int:
+    from app.api.auth.password_reset import cleanup_expired_tokens
+    from app.core.database import ReportingSessionLocal
+
+    with ReportingSessionLocal() as db:
+        return cleanup_expired_tokens(
+            db,
+            batch_size=settings.MAINTENANCE_DELETE_BATCH_SIZE,
+            max_batches=settings.MAINTENANCE_MAX_BATCHES,
+        )
+
+
+def _purge_principal_cache() -> int:
+    from app.api.auth.principals import principal_cache
+    return principal_cache.purge_expired()
+
+
+def _purge_frame_gates() -> int:
+    from app.core.detection.gating import gate_registry
+    return gate_registry.purge()
+
+
+def _check_replicas() -> int:
+    from app.core.replicas import replica_router
+    return replica_router.check()
+
+
+scheduler = MaintenanceScheduler()
+scheduler.add(
+    "password_reset_tokens", settings.MAINTENANCE_TOKEN_CLEANUP_SECONDS, _cleanup_password_reset_tokens
+)
+# In-memory structures are touched by request handlers on the event loop,
+# so they are purged there too
+scheduler.add(
+    "principal_cache", settings.MAINTENANCE_CACHE_PURGE_SECONDS, _purge_principal_cache, blocking=False
+)
+scheduler.add(
+    "frame_gates", settings.MAINTENANCE_CACHE_PURGE_SECONDS, _purge_frame_gates, blocking=False
+)
+# Replicas take no reads until their first lag check, which runs at startup
+scheduler.add(
+    "replica_lag",
+    settings.DB_REPLICA_LAG_CHECK_SECONDS if settings.DATABASE_REPLICA_URLS else 0,
+    _check_replicas,
+)
@@ -0,0 +1,95 @@
+from typing import Any, Dict
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Frame-level stages run in the inference workers; timings travel back in the
+# result dict so they are recorded here, in the API process, for both the
+# thread and the process executor.
+DETECTION_STAGE_SECONDS = Histogram(
+    "detection_stage_seconds",
+    "Time spent per detection stage",
+    ["stage"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+DETECTION_FRAMES = Counter("detection_frames_total", "Frames processed by the detector")
+DETECTION_FRAUDS = Counter("detection_frauds_total", "Frames flagged as fraud")
+DETECTION_DECODE_ERRORS = Counter("detection_decode_errors_total", "Frames that failed to decode")
+DETECTION_INFERENCE_ERRORS = Counter("detection_inference_errors_total", "Frames whose model call failed")
+DETECTION_REJECTED = Counter("detection_rejected_total", "Frames rejected because the queue was full")
+DETECTION_SKIPPED = Counter(
+    "detection_skipped_total", "Frames answered from the previous result by the frame gate"
+)
+DETECTION_BATCH_SIZE = Histogram(
+    "detection_batch_size",
+    "Frames per batched model call",
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+DETECTION_QUEUE_DEPTH = Gauge("detection_queue_depth", "Frames waiting to be batched")
+DETECTION_INFERENCE_PENDING = Gauge(
+    "detection_inference_pending", "Batches queued or running on inference workers"
+)
+
+PASSWORD_HASH_PENDING = Gauge(
+    "password_hash_pending", "Password hash and verify jobs queued or running"
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total", "Password jobs rejected because the bcrypt pool was full"
+)
+
+EMAIL_SENT = Counter("email_sent_total", "Emails accepted by the SMTP server")
+EMAIL_FAILED = Counter("email_failed_total", "Emails dropped after their last attempt or a full queue")
+EMAIL_RETRIED = Counter("email_retried_total", "Email sends scheduled for a retry")
+EMAIL_QUEUE_DEPTH = Gauge("email_queue_depth", "Emails waiting for a sender worker")
+
+MAINTENANCE_RUN_SECONDS = Histogram(
+    "maintenance_run_seconds",
+    "Duration of maintenance task runs",
+    ["task"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.5, 1, 5, 30, 120),
+)
+MAINTENANCE_ROWS = Counter("maintenance_rows_total", "Rows or entries removed by maintenance tasks", ["task"])
+MAINTENANCE_FAILURES = Counter("maintenance_failures_total", "Failed maintenance task runs", ["task"])
+
+PRINCIPAL_CACHE_REQUESTS = Counter(
+    "principal_cache_requests_total", "Principal cache lookups by outcome", ["result"]
+)
+
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds",
+    "Time to get a pooled connection, waiting for a free slot and pre-ping included",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently checked out", ["pool"])
+DB_POOL_OVERFLOW = Counter("db_pool_overflow_total", "Connections opened beyond pool_size", ["pool"])
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT", ["pool"]
+)
+DB_STATEMENT_TIMEOUTS = Counter(
+    "db_statement_timeouts_total", "Statements cancelled by statement_timeout", ["pool"]
+)
+
+DB_REPLICA_LAG_SECONDS = Gauge(
+    "db_replica_lag_seconds", "Replication lag at the last check, NaN while unreachable", ["replica"]
+)
+DB_READ_SESSIONS = Counter(
+    "db_read_sessions_total", "Read-only request sessions by the database they were routed to", ["target"]
+)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency per route",
+    ["method", "route", "status"],
+)
+
+
+def record_detection(result: Dict[str, Any]) -> None:
+    DETECTION_FRAMES.inc()
+    for stage, seconds in result.get("timings", {}).items():
+        DETECTION_STAGE_SECONDS.labels(stage).observe(seconds)
+    if result.get("is_fraud"):
+        DETECTION_FRAUDS.inc()
+    if result.get("error_stage") == "decode":
+        DETECTION_DECODE_ERRORS.inc()
+    elif result.get("error_stage") == "inference":
+        DETECTION_INFERENCE_ERRORS.inc()
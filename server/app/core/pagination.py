@@ -0,0 +1,66 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import DateTime, tuple_
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque cursor for the sort key of the last row on a page"""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(payload, list) or len(payload) != len(columns):
+            raise ValueError("cursor does not match the sort key")
+        return [
+            datetime.fromisoformat(value) if isinstance(column.type, DateTime) and value is not None else value
+            for value, column in zip(payload, columns)
+        ]
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def paginate(
+    query: Query,
+    columns: Sequence[Any],
+    key: Callable[[Any], Tuple[Any, ...]],
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+) -> Tuple[List[Any], Optional[str]]:
+    """Keyset-paginate `query` in ascending `columns` order.
+
+    `key` maps a result row to its values for `columns`. Returns the page and
+    the cursor for the next one, or None on the last page. `skip` is only
+    honoured without a cursor, for clients that still page by offset.
+    """
+    query = query.order_by(*columns)
+    if cursor:
+        query = query.filter(tuple_(*columns) > tuple_(*decode_cursor(cursor, columns)))
+    elif skip:
+        query = query.offset(skip)
+
+    # One extra row tells us whether there is a next page without a COUNT
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(key(rows[-1]))
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -0,0 +1,290 @@
+import itertools
+import logging
+import math
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import AsyncGenerator, Dict, Generator, Iterator, List, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import Delete, Insert, Update, create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.database import (
+    InstrumentedAsyncQueuePool,
+    InstrumentedQueuePool,
+    async_engine,
+    engine,
+    instrument_engine,
+)
+from app.core.metrics import DB_READ_SESSIONS, DB_REPLICA_LAG_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Carries read-your-writes with the client: a browser sends the cookie
+# back; other clients can echo the header. Either way every worker sees it
+PRIMARY_UNTIL_COOKIE = "read_primary_until"
+PRIMARY_UNTIL_HEADER = "X-Read-Primary-Until"
+
+# Seconds behind the primary; 0 when everything received has been replayed,
+# since an idle primary sends nothing and the replay timestamp stops moving
+PG_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class RoutingSession(Session):
+    """Session reading from `info["replica"]` and writing to `info["primary"]`.
+
+    Flushes go to the primary, and the session stays there once it has
+    flushed, so whatever it created or updated is read back from where it
+    was written.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            self.info["pinned"] = True
+        replica = self.info.get("replica")
+        if replica is None or self.info.get("pinned"):
+            return self.info["primary"]
+        return replica
+
+
+class WriteTracker:
+    wrote = False
+
+
+_current_writes: ContextVar[Optional[WriteTracker]] = ContextVar("current_writes", default=None)
+
+
+@contextmanager
+def track_writes() -> Iterator[WriteTracker]:
+    """Note whether any session flushed or ran DML inside the block.
+
+    Worker threads and tasks started inside it get a copy of the context,
+    and so the same tracker.
+    """
+    tracker = WriteTracker()
+    token = _current_writes.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current_writes.reset(token)
+
+
+def _mark_write() -> None:
+    tracker = _current_writes.get()
+    if tracker is not None:
+        tracker.wrote = True
+
+
+@event.listens_for(Session, "after_flush")
+def _on_flush(session, flush_context):
+    _mark_write()
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _on_execute(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _mark_write()
+
+
+@dataclass
+class Replica:
+    name: str
+    engine: Engine  # Lag checks, and sessions without DB_ASYNC
+    async_engine: Optional[AsyncEngine] = None
+    lag_seconds: Optional[float] = None  # None until the first check, and while unreachable
+    error: Optional[str] = None
+
+    def measure_lag(self) -> float:
+        with self.engine.connect() as connection:
+            if connection.dialect.name != "postgresql":
+                # Local stand-in: reachable is all we can tell
+                connection.execute(text("SELECT 1"))
+                return 0.0
+            return float(connection.execute(PG_LAG_QUERY).scalar())
+
+
+def _pool_args(url: str, is_async: bool) -> Dict:
+    args = {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_pre_ping": True,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+    }
+    if url.startswith("sqlite"):
+        args["connect_args"] = {"check_same_thread": False}
+    elif is_async:
+        args["connect_args"] = {
+            "timeout": 5,
+            "server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+        }
+    else:
+        args["connect_args"] = {
+            "connect_timeout": 5,
+            "options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+        }
+    return args
+
+
+def _async_url(url: str) -> str:
+    for scheme, async_scheme in (("postgresql://", "postgresql+asyncpg://"), ("sqlite://", "sqlite+aiosqlite://")):
+        if url.startswith(scheme):
+            return async_scheme + url[len(scheme):]
+    return url
+
+
+def create_replica(name: str, url: str, with_async: bool = False) -> Replica:
+    replica = Replica(name, create_engine(url, **_pool_args(url, is_async=False)))
+    instrument_engine(replica.engine, name)
+    if with_async:
+        async_url = _async_url(url)
+        replica.async_engine = create_async_engine(async_url, **_pool_args(async_url, is_async=True))
+        instrument_engine(replica.async_engine.sync_engine, f"{name}_async")
+    return replica
+
+
+class ReplicaRouter:
+    """Chooses where each read-only request session reads from.
+
+    Replicas within `max_lag_seconds` at their last check take turns. A
+    client that has just written reads from the primary until the
+    `primary_until` it got back from that write, `max_lag_seconds` later,
+    so it sees its own changes; with no usable replica every read goes to
+    the primary.
+    """
+
+    def __init__(
+        self,
+        primary: Engine,
+        replicas: List[Replica],
+        max_lag_seconds: float = 5,
+        async_primary: Optional[AsyncEngine] = None,
+    ):
+        self.primary = primary
+        self.async_primary = async_primary
+        self.replicas = replicas
+        self.max_lag_seconds = max_lag_seconds
+        self._turn = itertools.count()
+        self._sessions = sessionmaker(class_=RoutingSession, autoflush=False)
+        # expire_on_commit=False for the same reason as AsyncSessionLocal
+        self._async_sessions = async_sessionmaker(
+            sync_session_class=RoutingSession, autoflush=False, expire_on_commit=False
+        )
+
+    def check(self) -> int:
+        """Measure every replica's lag; run by the maintenance scheduler"""
+        for replica in self.replicas:
+            try:
+                replica.lag_seconds = replica.measure_lag()
+                replica.error = None
+            except SQLAlchemyError as e:
+                if replica.error is None:
+                    logger.warning("Replica %s unreachable, reading from the primary: %s", replica.name, e)
+                replica.lag_seconds = None
+                replica.error = str(e)
+            DB_REPLICA_LAG_SECONDS.labels(replica.name).set(
+                float("nan") if replica.lag_seconds is None else replica.lag_seconds
+            )
+        return 0
+
+    def choose(self, primary_until: Optional[float] = None) -> Optional[Replica]:
+        if primary_until is not None and primary_until > time.time():
+            return None
+        usable = [
+            replica for replica in self.replicas
+            if replica.lag_seconds is not None and replica.lag_seconds <= self.max_lag_seconds
+        ]
+        if not usable:
+            return None
+        return usable[next(self._turn) % len(usable)]
+
+    def pin(self, response: Response) -> None:
+        """Have the client behind `response` read from the primary until replicas caught up"""
+        if not self.replicas:
+            return
+        until = f"{time.time() + self.max_lag_seconds:.3f}"
+        response.set_cookie(
+            PRIMARY_UNTIL_COOKIE,
+            until,
+            max_age=math.ceil(self.max_lag_seconds),
+            httponly=True,
+            samesite="lax",
+        )
+        response.headers[PRIMARY_UNTIL_HEADER] = until
+
+    def primary_until(self, request: Request) -> Optional[float]:
+        """The pin `request` carries, if any; wall clock, as it crosses processes"""
+        value = request.headers.get(PRIMARY_UNTIL_HEADER) or request.cookies.get(PRIMARY_UNTIL_COOKIE)
+        try:
+            until = float(value)
+        except (TypeError, ValueError):
+            return None
+        # A pin is never set further out than the lag window; anything
+        # beyond it was not set by us and would keep a client off replicas
+        if until > time.time() + self.max_lag_seconds:
+            return None
+        return until
+
+    def session(self, primary_until: Optional[float] = None) -> Session:
+        replica = self.choose(primary_until)
+        DB_READ_SESSIONS.labels(replica.name if replica else "primary").inc()
+        return self._sessions(info={
+            "primary": self.primary,
+            "replica": replica.engine if replica else None,
+        })
+
+    def async_session(self, primary_until: Optional[float] = None) -> AsyncSession:
+        replica = self.choose(primary_until)
+        DB_READ_SESSIONS.labels(replica.name if replica else "primary").inc()
+        # run_sync hands the sync session our engines' sync_engine, as
+        # AsyncSession does for its own bind
+        return self._async_sessions(info={
+            "primary": self.async_primary.sync_engine,
+            "replica": replica.async_engine.sync_engine if replica else None,
+        })
+
+    def status(self) -> Dict[str, Dict]:
+        return {
+            replica.name: {
+                "lag_seconds": replica.lag_seconds,
+                "usable": replica.lag_seconds is not None and replica.lag_seconds <= self.max_lag_seconds,
+                "error": replica.error,
+            }
+            for replica in self.replicas
+        }
+
+
+replica_router = ReplicaRouter(
+    engine,
+    [
+        create_replica(f"replica{i}", url, with_async=settings.DB_ASYNC)
+        for i, url in enumerate(settings.DATABASE_REPLICA_URLS)
+    ],
+    max_lag_seconds=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    async_primary=async_engine,
+)
+
+
+def get_read_db(request: Request) -> Generator:
+    db = replica_router.session(replica_router.primary_until(request))
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    async with replica_router.async_session(replica_router.primary_until(request)) as db:
+        yield db
+
+# For read-only routes that tolerate DB_REPLICA_MAX_LAG_SECONDS of lag
+get_read_db_session = get_async_read_db if settings.DB_ASYNC else get_read_db
@@ -1,17 +1,82 @@
+import asyncio
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, TypeVar
 from passlib.context import CryptContext
 
+from app.core.config import settings
+from app.core.metrics import PASSWORD_HASH_PENDING, PASSWORD_HASH_REJECTED
+
 # Configure passlib to suppress warnings
 logging.getLogger('passlib').setLevel(logging.ERROR)
 
+# The only CryptContext in the app; verification reads the rounds from the
+# stored hash, so hashes made with other settings keep working
 pwd_context = CryptContext(
     schemes=["bcrypt"],
     deprecated="auto",
     bcrypt__ident="2b",
-    bcrypt__rounds=12   
+    bcrypt__rounds=12
 )
 
-def get_password_hash(password: str) -> str:
+T = TypeVar("T")
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when `PASSWORD_HASH_MAX_PENDING` hash jobs are already in flight"""
+
+
+# bcrypt releases the GIL, so a few threads hash in parallel while the event
+# loop keeps serving; the pool size caps the CPU a login storm can take
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS or min(4, os.cpu_count() or 1),
+    thread_name_prefix="bcrypt"
+)
+_pending = 0
+
+
+def _hash(password: str) -> str:
     if not password:
         raise ValueError("Password cannot be empty")
-    return pwd_context.hash(password)
\ No newline at end of file
+    return pwd_context.hash(password)
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+async def _run(function: Callable[..., T], *args) -> T:
+    global _pending
+    if _pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        PASSWORD_HASH_REJECTED.inc()
+        raise PasswordHasherBusy(f"{_pending} password hash jobs already pending")
+    _pending += 1
+    PASSWORD_HASH_PENDING.inc()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, function, *args)
+    finally:
+        _pending -= 1
+        PASSWORD_HASH_PENDING.dec()
+
+
+def get_password_hash(password: str) -> str:
+    """Hash on the bcrypt pool; for sync code already running off the event loop"""
+    return _hash_executor.submit(_hash, password).result()
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return _hash_executor.submit(_verify, plain_password, hashed_password).result()
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run(_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run(_verify, plain_password, hashed_password)
+
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """Hash many passwords on the bcrypt worker pool, keeping their order"""
+    return list(_hash_executor.map(_hash, passwords))
@@ -0,0 +1,243 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import os
+import re
+import tempfile
+import time
+from typing import Iterator, Optional, Tuple
+
+from app.core.config import settings
+
+BLOB_KEY_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+CHUNK_SIZE = 64 * 1024
+
+
+class BlobNotFound(Exception):
+    """Raised when a blob key is not in the store"""
+
+
+def blob_key(data: bytes) -> str:
+    """Content address of `data`: its sha256 hex digest"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _blob_signature(key: str, expires: int) -> str:
+    message = f"blob:{key}:{expires}".encode()
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+
+def signed_blob_url(key: str) -> str:
+    """Path serving blob `key` until a signed expiry.
+
+    The expiry is rounded up to a whole BLOB_URL_TTL_SECONDS window, so
+    incidents listed again within a window get the same URL and browsers
+    reuse their cached copy.
+    """
+    ttl = settings.BLOB_URL_TTL_SECONDS
+    expires = (int(time.time()) // ttl + 2) * ttl
+    return f"/blobs/{key}?expires={expires}&signature={_blob_signature(key, expires)}"
+
+
+def verify_blob_signature(key: str, expires: int, signature: str) -> bool:
+    return expires > time.time() and hmac.compare_digest(signature, _blob_signature(key, expires))
+
+
+def sniff_content_type(head: bytes) -> str:
+    if head.startswith(b"\xff\xd8"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
+class BlobStore:
+    """Content-addressed byte store; identical payloads are written once"""
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def write(self, key: str, data: bytes, content_type: str) -> None:
+        raise NotImplementedError
+
+    def open(self, key: str) -> Iterator[bytes]:
+        """Yield the blob in chunks, raising BlobNotFound before the first one"""
+        raise NotImplementedError
+
+    def put(self, data: bytes, content_type: Optional[str] = None) -> str:
+        key = blob_key(data)
+        if not self.exists(key):
+            self.write(key, data, content_type or sniff_content_type(data[:16]))
+        return key
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs as files under `root`, sharded by the first two hex bytes"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def write(self, key: str, data: bytes, content_type: str) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def open(self, key: str) -> Iterator[bytes]:
+        try:
+            f = open(self._path(key), "rb")
+        except FileNotFoundError:
+            raise BlobNotFound(key)
+        return self._read_chunks(f)
+
+    @staticmethod
+    def _read_chunks(f) -> Iterator[bytes]:
+        with f:
+            while chunk := f.read(CHUNK_SIZE):
+                yield chunk
+
+
+class S3BlobStore(BlobStore):
+    """Blobs in an S3 bucket; `endpoint_url` points it at MinIO or another stand-in"""
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: Optional[str] = None,
+        access_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        region: Optional[str] = None,
+        prefix: str = "blobs/",
+    ):
+        import boto3
+
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url or None,
+            aws_access_key_id=access_key or None,
+            aws_secret_access_key=secret_key or None,
+            region_name=region or None,
+        )
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def write(self, key: str, data: bytes, content_type: str) -> None:
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=self._key(key),
+            Body=data,
+            ContentType=content_type,
+        )
+
+    def open(self, key: str) -> Iterator[bytes]:
+        from botocore.exceptions import ClientError
+
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._key(key))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                raise BlobNotFound(key)
+            raise
+        return response["Body"].iter_chunks(CHUNK_SIZE)
+
+
+def decode_data_url(value: str) -> bytes:
+    """Raw bytes of a `data:<type>;base64,<payload>` URL or a bare base64 string"""
+    if value.startswith("data:"):
+        _, _, value = value.partition(",")
+    value = "".join(value.split())  # Line-wrapped base64 is still valid
+    try:
+        data = base64.b64decode(value + "=" * (-len(value) % 4), validate=True)
+    except binascii.Error as e:
+        raise ValueError(f"Invalid base64 image: {e}")
+    if not data:
+        raise ValueError("Empty image")
+    return data
+
+
+def make_thumbnail(data: bytes, max_size: int) -> Optional[bytes]:
+    """JPEG thumbnail whose longest side is at most `max_size`.
+
+    Raises ValueError when the bytes are not an image OpenCV can decode.
+    """
+    import cv2
+    import numpy as np
+
+    # Let libjpeg skip work when the source is much larger than the thumbnail
+    frame = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_REDUCED_COLOR_2)
+    if frame is None:
+        raise ValueError("Screenshot is not a decodable image")
+    height, width = frame.shape[:2]
+    ratio = max_size / max(height, width)
+    if ratio < 1:
+        frame = cv2.resize(
+            frame,
+            (max(1, int(width * ratio)), max(1, int(height * ratio))),
+            interpolation=cv2.INTER_AREA,
+        )
+    ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
+    return encoded.tobytes() if ok else None
+
+
+def save_screenshot(data: bytes) -> Tuple[str, Optional[str]]:
+    """Store a screenshot and its thumbnail, returning both blob keys.
+
+    Raises ValueError, before storing anything, for undecodable images.
+    """
+    store = get_blob_store()
+    thumbnail = make_thumbnail(data, settings.BLOB_THUMBNAIL_SIZE)
+    thumbnail_key = store.put(thumbnail, "image/jpeg") if thumbnail else None
+    # The screenshot goes last, so an existing screenshot blob implies its thumbnail exists
+    return store.put(data), thumbnail_key
+
+
+_blob_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    global _blob_store
+    if _blob_store is None:
+        if settings.BLOB_STORE == "s3":
+            _blob_store = S3BlobStore(
+                bucket=settings.BLOB_S3_BUCKET,
+                endpoint_url=settings.BLOB_S3_ENDPOINT_URL,
+                access_key=settings.BLOB_S3_ACCESS_KEY,
+                secret_key=settings.BLOB_S3_SECRET_KEY,
+                region=settings.BLOB_S3_REGION,
+            )
+        elif settings.BLOB_STORE == "local":
+            _blob_store = LocalBlobStore(settings.BLOB_LOCAL_DIR)
+        else:
+            raise ValueError(f"Unknown blob store: {settings.BLOB_STORE}")
+    return _blob_store
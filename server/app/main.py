@@ -1,22 +1,104 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response, status
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.core.database import Base, engine
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from starlette.concurrency import run_in_threadpool
+from app.api.auth.principals import principal_invalidations
+from app.core.database import initialize_database
+from app.core.detection.batching import detection_batcher
+from app.core.detection.executor import inference_executor
+from app.core.email import email_queue
+from app.core.maintenance import scheduler
+from app.core.metrics import HTTP_REQUEST_SECONDS
+from app.core.replicas import replica_router, track_writes
+
+logger = logging.getLogger(__name__)
+
+readiness = {"database": False, "model": False, "errors": {}}
+
+async def warm_up_model():
+    try:
+        await inference_executor.warm_up()
+        readiness["model"] = True
+    except Exception as e:
+        logger.exception("Model warm-up failed")
+        readiness["errors"]["model"] = str(e)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create tables and seed roles here instead of at import time, so that
+    # importing the app (tests, alembic, scripts) needs no live database
+    try:
+        await run_in_threadpool(initialize_database)
+        readiness["database"] = True
+    except Exception as e:
+        logger.exception("Database initialization failed")
+        readiness["errors"]["database"] = str(e)
+
+    # Loading the model takes seconds; serve other routes meanwhile and
+    # report progress through /ready
+    warm_up_task = asyncio.create_task(warm_up_model())
+    email_queue.start()
+    scheduler.start()
+    principal_invalidations.start()
+    yield
+    warm_up_task.cancel()
+    principal_invalidations.stop()
+    await scheduler.stop()
+    await email_queue.stop()
+    await detection_batcher.stop()
+    inference_executor.shutdown()
 
 # Initialize FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Configure CORS middleware
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
-    allow_methods=["*"],  
-    allow_headers=["*"],  
-    expose_headers=["*"], 
+    allow_methods=["*"],
+    allow_headers=["*"],
+    expose_headers=["*"],
 )
 
-# Initialize DB
-Base.metadata.create_all(bind=engine)
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template so /exams/1 and /exams/2 share a series
+    route = request.scope.get("route")
+    HTTP_REQUEST_SECONDS.labels(
+        request.method,
+        route.path if route else "unmatched",
+        response.status_code,
+    ).observe(time.perf_counter() - started)
+    return response
+
+@app.middleware("http")
+async def pin_writers_to_primary(request: Request, call_next):
+    with track_writes() as writes:
+        response = await call_next(request)
+    # Read-your-writes: after a request that wrote to the database, the
+    # client's replica-routed reads go to the primary until replicas caught
+    # up. Detection and login POSTs write nothing and pin nobody.
+    if writes.wrote and response.status_code < 400:
+        replica_router.pin(response)
+    return response
+
+@app.exception_handler(PoolTimeoutError)
+async def database_busy(request: Request, exc: PoolTimeoutError):
+    # Every pooled connection stayed checked out for DB_POOL_TIMEOUT
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Database is busy, retry shortly"},
+        headers={"Retry-After": "1"},
+    )
 
 # Include routers
 from app.api.users import routes as user_routes
@@ -24,6 +106,7 @@ from app.api.roles import routes as role_routes
 from app.api.auth import routes as auth_routes
 from app.api.classes import routes as class_routes
 from app.api.exams import routes as exams_routes
+from app.api.blobs import routes as blob_routes
 from app.api.endpoints import ai_detection
 
 app.include_router(user_routes.router)
@@ -31,6 +114,7 @@ app.include_router(role_routes.router)
 app.include_router(auth_routes.router)
 app.include_router(class_routes.router)
 app.include_router(exams_routes.router)
+app.include_router(blob_routes.router)
 app.include_router(
     ai_detection.router,
     prefix="/api/ai",
@@ -39,4 +123,22 @@ app.include_router(
 
 @app.get("/")
 def health_check():
-    return {"status": "OK"}
\ No newline at end of file
+    return {"status": "OK"}
+
+@app.get("/ready")
+def readiness_check(response: Response):
+    ready = readiness["database"] and readiness["model"]
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {
+        "ready": ready,
+        "database": readiness["database"],
+        "model": readiness["model"],
+        "errors": readiness["errors"],
+        "maintenance": scheduler.status(),
+        "replicas": replica_router.status(),
+    }
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
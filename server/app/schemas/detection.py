@@ -11,4 +11,6 @@ class DetectionResult(BaseModel):
     detections: List[DetectionItem] = []
     is_fraud: bool
     timestamp: str
-    error: Optional[str] = None
\ No newline at end of file
+    error: Optional[str] = None
+    skipped: bool = False
+    skip_rate: Optional[float] = None
\ No newline at end of file
@@ -0,0 +1,256 @@
+"""Benchmark fraud detection per stage and end to end.
+
+Builds (or reuses) a corpus of synthetic JPEG frames at 480p, 720p and
+1080p, then measures:
+
+* per-stage timings: base64 decode, full-size imdecode and cvtColor
+  (the original path), decode_resize (reduced-size decode plus
+  letterbox into the reused input buffer, the path the detector takes),
+  inference, postprocess and pydantic serialization, per resolution;
+* end-to-end latency (p50/p95/p99) and frames/sec of the detect routes at
+  the requested concurrency, through an in-process ASGI client, after
+  warming up every inference worker and one untimed round per level.
+
+Results are written as JSON so runs can be diffed against each other.
+
+    cd server
+    python scripts/bench_detection.py --output bench.json --concurrency 1 8 32
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+RESOLUTIONS = {
+    "480p": (640, 480),
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+}
+
+
+def build_corpus(directory: str, frames_per_resolution: int, seed: int = 0) -> Dict[str, List[bytes]]:
+    """Load the corpus from `directory`, generating any missing frames"""
+    rng = np.random.default_rng(seed)
+    corpus: Dict[str, List[bytes]] = {}
+    os.makedirs(directory, exist_ok=True)
+
+    for name, (width, height) in RESOLUTIONS.items():
+        corpus[name] = []
+        for i in range(frames_per_resolution):
+            path = os.path.join(directory, f"{name}_{i:03d}.jpg")
+            if not os.path.exists(path):
+                # Smooth background plus a few solid shapes compresses like a
+                # webcam frame, unlike pure noise
+                frame = cv2.resize(
+                    rng.integers(0, 255, (height // 16, width // 16, 3), dtype=np.uint8),
+                    (width, height),
+                    interpolation=cv2.INTER_CUBIC,
+                )
+                for _ in range(5):
+                    center = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+                    radius = int(rng.integers(height // 20, height // 5))
+                    color = tuple(int(c) for c in rng.integers(0, 255, 3))
+                    cv2.circle(frame, center, radius, color, -1)
+                cv2.imwrite(path, frame, [cv2.IMWRITE_JPEG_QUALITY, 92])
+            with open(path, "rb") as f:
+                corpus[name].append(f.read())
+    return corpus
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    values = np.asarray(samples_ms, dtype=np.float64)
+    return {
+        "count": int(values.size),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+    }
+
+
+def bench_stages(detector, corpus: Dict[str, List[bytes]], repeat: int) -> Dict[str, Dict]:
+    from app.schemas.detection import DetectionResult
+
+    report = {}
+    for name, frames in corpus.items():
+        stages: Dict[str, List[float]] = {
+            "base64_decode": [],
+            "imdecode": [],
+            "cvtColor": [],
+            "decode_resize": [],
+            "inference": [],
+            "postprocess": [],
+            "serialization": [],
+        }
+        encoded = [base64.b64encode(frame).decode() for frame in frames]
+        for _ in range(repeat):
+            for image_data in encoded:
+                t0 = time.perf_counter()
+                raw = base64.b64decode(image_data)
+                t1 = time.perf_counter()
+                frame = cv2.imdecode(np.frombuffer(raw, np.uint8), cv2.IMREAD_COLOR)
+                t2 = time.perf_counter()
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                t3 = time.perf_counter()
+                small, scale, shape = detector._decode_image(raw)
+                canvas, geometry = detector._preprocess(small, scale, shape, 0)
+                t4 = time.perf_counter()
+                prediction = detector.model.predict(
+                    [canvas],
+                    conf=detector.min_confidence,
+                    classes=detector.cheating_class_ids.tolist(),
+                )[0]
+                t5 = time.perf_counter()
+                result = detector._build_result(prediction, geometry=geometry)
+                t6 = time.perf_counter()
+                DetectionResult(**result).model_dump_json()
+                t7 = time.perf_counter()
+
+                stages["base64_decode"].append((t1 - t0) * 1000)
+                stages["imdecode"].append((t2 - t1) * 1000)
+                stages["cvtColor"].append((t3 - t2) * 1000)
+                stages["decode_resize"].append((t4 - t3) * 1000)
+                stages["inference"].append((t5 - t4) * 1000)
+                stages["postprocess"].append((t6 - t5) * 1000)
+                stages["serialization"].append((t7 - t6) * 1000)
+
+        report[name] = {stage: summarize(samples) for stage, samples in stages.items()}
+    return report
+
+
+async def bench_end_to_end(
+    corpus: Dict[str, List[bytes]],
+    endpoint: str,
+    concurrency: int,
+    requests_per_level: int,
+) -> Dict[str, Dict]:
+    import httpx
+    from fastapi import FastAPI
+    from app.api.endpoints import ai_detection
+    from app.core.detection.executor import inference_executor
+
+    app = FastAPI()
+    app.include_router(ai_detection.router, prefix="/api/ai")
+
+    # Load the model on every worker before timing, as the app's lifespan does
+    await inference_executor.warm_up()
+
+    report = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for name, frames in corpus.items():
+            encoded = [base64.b64encode(frame).decode() for frame in frames]
+            latencies: List[float] = []
+            errors = 0
+
+            async def send(i: int) -> httpx.Response:
+                if endpoint == "frame":
+                    return await client.post(
+                        "/api/ai/detect/frame",
+                        content=frames[i % len(frames)],
+                        headers={"Content-Type": "application/octet-stream"},
+                    )
+                return await client.post(
+                    "/api/ai/detect",
+                    json={"image_data": encoded[i % len(encoded)]},
+                )
+
+            # One untimed round at this concurrency and resolution first
+            await asyncio.gather(*(send(i) for i in range(concurrency)))
+
+            counter = iter(range(requests_per_level))
+
+            async def worker():
+                nonlocal errors
+                for i in counter:
+                    started = time.perf_counter()
+                    response = await send(i)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    if response.status_code != 200 or response.json().get("error"):
+                        errors += 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - started
+
+            report[name] = {
+                **summarize(latencies),
+                "frames_per_sec": len(latencies) / elapsed,
+                "errors": errors,
+            }
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", default="bench_corpus", help="Frame corpus directory")
+    parser.add_argument("--frames", type=int, default=10, help="Frames per resolution")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the corpus for stage timings")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=100, help="Requests per concurrency level")
+    parser.add_argument("--endpoint", choices=["json", "frame"], default="json")
+    parser.add_argument("--skip-stages", action="store_true")
+    parser.add_argument("--skip-end-to-end", action="store_true")
+    parser.add_argument("--output", default="bench_detection.json")
+    args = parser.parse_args()
+
+    from app.core.config import settings
+
+    corpus = build_corpus(args.corpus, args.frames)
+    report = {
+        "started_at": datetime.now().isoformat(),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "settings": {
+            key: getattr(settings, key)
+            for key in dir(settings)
+            if key.startswith("DETECTION_")
+        },
+        "frame_bytes": {
+            name: int(np.mean([len(frame) for frame in frames]))
+            for name, frames in corpus.items()
+        },
+    }
+
+    if not args.skip_stages:
+        from app.core.detection.fraud_detector import FraudDetector
+
+        report["stages"] = bench_stages(FraudDetector(), corpus, args.repeat)
+
+    if not args.skip_end_to_end:
+        from app.core.detection.executor import inference_executor
+
+        report["end_to_end"] = {
+            "endpoint": args.endpoint,
+            "executor": inference_executor.kind,
+            "workers": inference_executor.workers,
+            "levels": {
+                str(level): asyncio.run(
+                    bench_end_to_end(corpus, args.endpoint, level, args.requests)
+                )
+                for level in args.concurrency
+            },
+        }
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(json.dumps(report, indent=2, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""Benchmark a login storm, like a class signing in at exam start.
+
+Seeds an in-memory SQLite database with users sharing one real bcrypt hash
+(12 rounds), then fires `--logins` POST /auth/login requests at the given
+concurrency through an in-process ASGI client. Meanwhile a probe sleeps
+10 ms at a time on the event loop and records how late it wakes up: that
+lag is added to every other request the API is serving.
+
+Runs each mode:
+
+* inline: bcrypt verify on the event loop (the old behaviour);
+* pool: verify on the bounded bcrypt worker pool.
+
+Results are written as JSON so runs can be diffed against each other.
+
+    cd server
+    python scripts/bench_login_storm.py --logins 64 --concurrency 8 32 --output login.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PASSWORD = "correct horse battery staple"
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    values = sorted(samples_ms)
+
+    def percentile(p: float) -> float:
+        return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+    return {
+        "count": len(values),
+        "mean_ms": statistics.fmean(values),
+        "p50_ms": percentile(50),
+        "p95_ms": percentile(95),
+        "p99_ms": percentile(99),
+        "max_ms": values[-1],
+    }
+
+
+def build_app(users: int):
+    from fastapi import FastAPI
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from app.api.auth import routes as auth_routes
+    from app.api.classes import models as _class_models  # noqa: F401, mapper registry
+    from app.api.exams import models as _exam_models  # noqa: F401
+    from app.api.roles.models import Role
+    from app.api.users.models import User
+    from app.core.database import Base, get_db
+    from app.core.security import get_password_hash
+
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    password_hash = get_password_hash(PASSWORD)
+    with Session() as session:
+        session.add(Role(id=2, name="supervisor"))
+        for user_id in range(1, users + 1):
+            session.add(User(
+                id=user_id,
+                email=f"user{user_id}@example.com",
+                full_name="User",
+                role_id=2,
+                password_hash=password_hash,
+            ))
+        session.commit()
+
+    def get_test_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(auth_routes.router)
+    app.dependency_overrides[get_db] = get_test_db
+
+    return app
+
+
+async def run_storm(app, logins: int, users: int, concurrency: int) -> Dict:
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        semaphore = asyncio.Semaphore(concurrency)
+        login_ms: List[float] = []
+        lag_ms: List[float] = []
+        statuses: Dict[int, int] = {}
+        done = asyncio.Event()
+
+        async def login(i: int) -> None:
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/auth/login", data={
+                    "username": f"user{i % users + 1}@example.com",
+                    "password": PASSWORD,
+                })
+                login_ms.append((time.perf_counter() - started) * 1000)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        async def probe() -> None:
+            while not done.is_set():
+                started = time.perf_counter()
+                await asyncio.sleep(0.01)
+                lag_ms.append(max(0.0, (time.perf_counter() - started) * 1000 - 10))
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(logins)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+
+    return {
+        "concurrency": concurrency,
+        "logins_per_second": logins / elapsed,
+        "statuses": statuses,
+        "login": summarize(login_ms),
+        "loop_lag": summarize(lag_ms),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--users", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 32])
+    parser.add_argument("--modes", nargs="+", choices=["inline", "pool"], default=["inline", "pool"])
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    from app.api.auth import services as auth_services
+    from app.core import security
+
+    pooled = auth_services.verify_password_async
+
+    async def inline(plain_password: str, hashed_password: str) -> bool:
+        return security.pwd_context.verify(plain_password, hashed_password)
+
+    app = build_app(args.users)
+    report = {
+        "started_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "hash_workers": security._hash_executor._max_workers,
+        "runs": {},
+    }
+    for mode in args.modes:
+        auth_services.verify_password_async = inline if mode == "inline" else pooled
+        report["runs"][mode] = []
+        for concurrency in args.concurrency:
+            result = asyncio.run(run_storm(app, args.logins, args.users, concurrency))
+            report["runs"][mode].append(result)
+            print(
+                f"{mode:6} c={concurrency:<3} {result['logins_per_second']:6.1f} logins/s  "
+                f"login p95 {result['login']['p95_ms']:7.1f} ms  "
+                f"loop lag p95 {result['loop_lag']['p95_ms']:7.1f} ms  max {result['loop_lag']['max_ms']:7.1f} ms  "
+                f"{result['statuses']}"
+            )
+    auth_services.verify_password_async = pooled
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""Email queue check against an in-process SMTP stand-in.
+
+Starts a minimal SMTP server on localhost that counts connections and
+messages and answers the first `--fail` DATA commands with a transient
+451, then queues `--emails` password reset emails through the real queue
+and waits for them to go out. Fails unless every message arrives, the
+transient failures were retried, and the messages shared a handful of
+pooled connections instead of opening one each.
+
+    cd server
+    python scripts/check_email_queue.py --emails 200 --fail 3
+
+To eyeball the rendered mail instead, run the mailpit service from
+docker-compose.yml with SMTP_PORT=1025 SMTP_TLS=none and open
+http://localhost:8025.
+"""
+import argparse
+import asyncio
+import os
+import socketserver
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class Stats:
+    lock = threading.Lock()
+    connections = 0
+    messages = 0
+    fail_remaining = 0
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: EHLO, MAIL, RCPT, DATA, RSET, NOOP, QUIT"""
+
+    def reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        with Stats.lock:
+            Stats.connections += 1
+        self.reply("220 stand-in ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self.reply("250 stand-in")
+            elif command.startswith(("MAIL", "RCPT", "RSET", "NOOP")):
+                self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                with Stats.lock:
+                    failing = Stats.fail_remaining > 0
+                    if failing:
+                        Stats.fail_remaining -= 1
+                    else:
+                        Stats.messages += 1
+                self.reply("451 Try again later" if failing else "250 Queued")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Not implemented")
+
+
+class SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+async def run(emails: int, timeout: float) -> float:
+    from app.core.email import email_queue, send_reset_password_email
+
+    email_queue.start()
+    started = time.perf_counter()
+    for i in range(emails):
+        send_reset_password_email(f"student{i}@example.com", f"token{i}")
+    while Stats.messages < emails and time.perf_counter() - started < timeout:
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - started
+    await email_queue.stop()
+    return elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--emails", type=int, default=200)
+    parser.add_argument("--fail", type=int, default=3, help="transient 451 replies to send first")
+    parser.add_argument("--timeout", type=float, default=30)
+    args = parser.parse_args()
+
+    server = SMTPServer(("127.0.0.1", 0), SMTPHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    Stats.fail_remaining = args.fail
+
+    os.environ.update({
+        "SMTP_HOST": "127.0.0.1",
+        "SMTP_PORT": str(server.server_address[1]),
+        "SMTP_TLS": "none",
+        "SMTP_USER": "",
+        "EMAIL_RETRY_BASE_SECONDS": "0.1",
+    })
+    elapsed = asyncio.run(run(args.emails, args.timeout))
+    server.shutdown()
+
+    from app.core.config import settings
+    ok = Stats.messages == args.emails and Stats.connections <= settings.SMTP_POOL_SIZE * 2
+    print(
+        f"{Stats.messages}/{args.emails} delivered in {elapsed:.2f}s over "
+        f"{Stats.connections} connections (pool size {settings.SMTP_POOL_SIZE}), "
+        f"{args.fail - Stats.fail_remaining} transient failures retried"
+        f"{'' if ok else '  FAIL'}"
+    )
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Import-time budget check.
+
+Imports each group of modules in a fresh interpreter and fails when the
+import takes longer than its budget or pulls in a forbidden package. It
+keeps torch/ultralytics out of everything but the inference workers, and
+keeps the CRUD modules free of the detection stack entirely.
+
+    cd server
+    python scripts/check_import_time.py
+"""
+import json
+import os
+import subprocess
+import sys
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (modules, forbidden top-level packages, budget in seconds)
+CHECKS = [
+    (
+        [
+            "app.api.users.routes",
+            "app.api.roles.routes",
+            "app.api.auth.routes",
+            "app.api.classes.routes",
+            "app.api.exams.routes",
+            "app.core.database",
+        ],
+        ["torch", "ultralytics", "onnxruntime", "cv2", "numpy"],
+        2.0,
+    ),
+    (
+        ["app.main"],
+        ["torch", "ultralytics", "onnxruntime"],
+        3.0,
+    ),
+]
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+for name in sys.argv[1:]:
+    __import__(name)
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    "elapsed": elapsed,
+    "modules": sorted({name.split(".")[0] for name in sys.modules}),
+}))
+"""
+
+
+def main() -> int:
+    failures = 0
+    for modules, forbidden, budget in CHECKS:
+        completed = subprocess.run(
+            [sys.executable, "-c", PROBE, *modules],
+            cwd=SERVER_DIR,
+            capture_output=True,
+            text=True,
+        )
+        label = ", ".join(modules)
+        if completed.returncode != 0:
+            print(f"FAIL  {label}: import error\n{completed.stderr}")
+            failures += 1
+            continue
+
+        probe = json.loads(completed.stdout.strip().splitlines()[-1])
+        leaked = sorted(set(forbidden) & set(probe["modules"]))
+        too_slow = probe["elapsed"] > budget
+        status = "FAIL" if leaked or too_slow else "ok"
+        print(f"{status:5} {label}: {probe['elapsed']:.2f}s (budget {budget:.1f}s)")
+        if leaked:
+            print(f"      pulls in {', '.join(leaked)}")
+        failures += status == "FAIL"
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""Check that the ONNX Runtime backend matches the PyTorch backend.
+
+Runs both backends over a fixed set of images and pairs up detections by
+class and IoU. Exits non-zero when a detection has no counterpart or the
+confidences differ by more than the tolerance.
+
+    cd server
+    python scripts/check_onnx_parity.py --images path/to/frames [--int8]
+"""
+import argparse
+import glob
+import os
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.detection.backends import (  # noqa: E402
+    OnnxBackend,
+    UltralyticsBackend,
+    export_onnx,
+    quantize_int8,
+)
+
+MODEL_PATH = "app/core/detection/models/best.pt"
+
+
+def iou(a: np.ndarray, b: np.ndarray) -> float:
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def compare(reference, candidate, min_iou: float, conf_tolerance: float, min_conf: float):
+    """Return a list of mismatch descriptions for one frame"""
+    problems = []
+    ref_boxes, ref_conf, ref_cls = reference
+    cand_boxes, cand_conf, cand_cls = candidate
+    unmatched = set(range(len(cand_boxes)))
+
+    for i in np.argsort(-ref_conf):
+        if ref_conf[i] < min_conf:
+            continue
+        best, best_iou = None, min_iou
+        for j in unmatched:
+            if cand_cls[j] != ref_cls[i]:
+                continue
+            overlap = iou(ref_boxes[i], cand_boxes[j])
+            if overlap >= best_iou:
+                best, best_iou = j, overlap
+        if best is None:
+            problems.append(f"missing class {int(ref_cls[i])} conf {ref_conf[i]:.3f}")
+            continue
+        unmatched.discard(best)
+        if abs(float(ref_conf[i]) - float(cand_conf[best])) > conf_tolerance:
+            problems.append(
+                f"class {int(ref_cls[i])} conf {ref_conf[i]:.3f} vs {cand_conf[best]:.3f}"
+            )
+
+    for j in unmatched:
+        if cand_conf[j] >= min_conf + conf_tolerance:
+            problems.append(f"extra class {int(cand_cls[j])} conf {cand_conf[j]:.3f}")
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", required=True, help="Directory of .jpg/.png frames")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--int8", action="store_true", help="Compare the INT8 model")
+    parser.add_argument("--min-iou", type=float, default=0.9)
+    parser.add_argument("--conf-tolerance", type=float, default=0.05)
+    parser.add_argument("--min-conf", type=float, default=0.3,
+                        help="Ignore reference detections below this confidence")
+    args = parser.parse_args()
+
+    if args.int8:
+        # Quantization moves scores more than fp32 export does
+        args.min_iou = min(args.min_iou, 0.8)
+        args.conf_tolerance = max(args.conf_tolerance, 0.1)
+
+    paths = sorted(
+        p for p in glob.glob(os.path.join(args.images, "*"))
+        if p.lower().endswith((".jpg", ".jpeg", ".png"))
+    )
+    if not paths:
+        print(f"No images found in {args.images}")
+        return 2
+
+    onnx_path = f"{os.path.splitext(args.model)[0]}.onnx"
+    if not os.path.exists(onnx_path):
+        export_onnx(args.model, onnx_path)
+    if args.int8:
+        int8_path = f"{os.path.splitext(onnx_path)[0]}.int8.onnx"
+        if not os.path.exists(int8_path):
+            quantize_int8(onnx_path, int8_path)
+        onnx_path = int8_path
+
+    reference_backend = UltralyticsBackend(args.model)
+    candidate_backend = OnnxBackend(onnx_path)
+
+    failures = 0
+    for path in paths:
+        frame = cv2.cvtColor(cv2.imread(path, cv2.IMREAD_COLOR), cv2.COLOR_BGR2RGB)
+        reference = reference_backend.predict([frame])[0]
+        candidate = candidate_backend.predict([frame])[0]
+        problems = compare(reference, candidate, args.min_iou, args.conf_tolerance, args.min_conf)
+        status = "ok" if not problems else "MISMATCH"
+        print(f"{status:8} {os.path.basename(path)} ({len(reference[0])} vs {len(candidate[0])} boxes)")
+        for problem in problems:
+            print(f"         {problem}")
+        failures += bool(problems)
+
+    print(f"{len(paths) - failures}/{len(paths)} frames match")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
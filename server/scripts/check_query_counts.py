@@ -0,0 +1,185 @@
+"""SQL statement and row budget check for the list and detail endpoints.
+
+Seeds an in-memory SQLite database, calls each endpoint through the real
+routers and counts the statements executed and the rows fetched from the
+driver. Fails when an endpoint goes over its budget, which is what an
+N+1 lazy load or a collection joinedload (one row per child, repeated
+parent columns) looks like.
+
+    cd server
+    python scripts/check_query_counts.py
+"""
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CLASSES = 10
+STUDENTS_PER_CLASS = 50
+EXAMS_PER_CLASS = 5
+INCIDENTS_PER_EXAM = 4
+
+# endpoint -> (max statements, max rows fetched)
+BUDGETS = {
+    "/roles/": (1, 3),
+    # limit + 1 users (the extra row detects the next page) plus their classes
+    "/users/?limit=100": (2, 2 * 101),
+    "/users/1": (2, 2),
+    "/classes/": (2, CLASSES + CLASSES * (STUDENTS_PER_CLASS + 1)),
+    "/classes/1": (2, 1 + STUDENTS_PER_CLASS + 1),
+    "/classes/1/users": (2, 1 + STUDENTS_PER_CLASS + 1),
+    "/exams/": (1, CLASSES * EXAMS_PER_CLASS),
+    "/exams/class/1": (1, EXAMS_PER_CLASS),
+    "/exams/1": (1, 1),
+    "/exams/1/incidents": (2, 1 + INCIDENTS_PER_EXAM),
+}
+
+
+class Counter:
+    statements = 0
+    rows = 0
+    values = 0  # rows x columns; shows parent columns repeated by joins
+
+    @classmethod
+    def reset(cls):
+        cls.statements = 0
+        cls.rows = 0
+        cls.values = 0
+
+    @classmethod
+    def add(cls, rows):
+        cls.rows += len(rows)
+        cls.values += sum(len(row) for row in rows)
+
+
+class CountingCursor(sqlite3.Cursor):
+    def fetchone(self):
+        row = super().fetchone()
+        Counter.add([row] if row is not None else [])
+        return row
+
+    def fetchmany(self, *args):
+        rows = super().fetchmany(*args)
+        Counter.add(rows)
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        Counter.add(rows)
+        return rows
+
+
+class CountingConnection(sqlite3.Connection):
+    def cursor(self, factory=CountingCursor):
+        return super().cursor(factory)
+
+
+def build_engine():
+    engine = create_engine(
+        "sqlite://",
+        creator=lambda: sqlite3.connect(":memory:", factory=CountingConnection, check_same_thread=False),
+        poolclass=StaticPool,
+    )
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        Counter.statements += 1
+
+    return engine
+
+
+def seed(session) -> None:
+    from app.api.classes.models import Class, UserClassAssociation
+    from app.api.exams.models import Exam, FraudIncident
+    from app.api.roles.models import Role
+    from app.api.users.models import User
+
+    for role_id, name in enumerate(["student", "supervisor", "admin"], 1):
+        session.add(Role(id=role_id, name=name))
+    session.add(User(id=1, email="admin@example.com", full_name="Admin", role_id=3))
+
+    started = datetime(2025, 1, 1)
+    user_id = 1
+    for class_id in range(1, CLASSES + 1):
+        session.add(Class(id=class_id, name=f"Class {class_id}", studying_program="CS", year=1))
+        for _ in range(STUDENTS_PER_CLASS):
+            user_id += 1
+            session.add(User(id=user_id, email=f"student{user_id}@example.com", full_name="Student", role_id=1))
+            session.add(UserClassAssociation(user_id=user_id, class_id=class_id))
+        for i in range(EXAMS_PER_CLASS):
+            exam = Exam(
+                name=f"Exam {class_id}.{i}",
+                exam_date=started + timedelta(days=i),
+                class_id=class_id,
+                fraud_evidence=[{"screenshot": "x" * 1000}],
+            )
+            session.add(exam)
+            session.flush()
+            for j in range(INCIDENTS_PER_EXAM):
+                session.add(FraudIncident(exam_id=exam.id, timestamp=started + timedelta(minutes=j), detections=[]))
+    session.commit()
+
+
+def main() -> int:
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.api.auth.services import get_current_admin, get_current_supervisor
+    from app.api.classes import routes as class_routes
+    from app.api.exams import routes as exam_routes
+    from app.api.roles import routes as role_routes
+    from app.api.users import routes as user_routes
+    from app.core.database import Base, get_db, get_db_session
+    from app.core.replicas import get_read_db_session
+
+    engine = build_engine()
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    with Session() as session:
+        seed(session)
+        from app.api.users.models import User
+        admin = session.get(User, 1)
+        session.expunge(admin)
+
+    def get_test_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    for routes in (user_routes, role_routes, class_routes, exam_routes):
+        app.include_router(routes.router)
+    app.dependency_overrides[get_db] = get_test_db
+    app.dependency_overrides[get_db_session] = get_test_db
+    app.dependency_overrides[get_read_db_session] = get_test_db
+    app.dependency_overrides[get_current_supervisor] = lambda: admin
+    app.dependency_overrides[get_current_admin] = lambda: admin
+    client = TestClient(app)
+
+    failures = 0
+    print(f"{'endpoint':24} {'statements':>13} {'rows':>13} {'values':>8}")
+    for path, (max_statements, max_rows) in BUDGETS.items():
+        Counter.reset()
+        response = client.get(path)
+        statements, rows = Counter.statements, Counter.rows
+        over = response.status_code != 200 or statements > max_statements or rows > max_rows
+        failures += over
+        print(
+            f"{path:24} {statements:>5} / {max_statements:<5} {rows:>5} / {max_rows:<5} {Counter.values:>8}"
+            f"{'  FAIL' if over else ''}"
+            f"{f' (HTTP {response.status_code})' if response.status_code != 200 else ''}"
+        )
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
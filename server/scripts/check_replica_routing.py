@@ -0,0 +1,182 @@
+"""Read-replica routing check against two SQLite stand-ins.
+
+Seeds a primary database file, copies it to a replica file, then adds one
+more exam to the primary only, so the replica lags by exactly that exam.
+Mounts the real exams router with a ReplicaRouter over the two files and
+checks that:
+
+* list reads go to the replica;
+* after a write, that client reads from the primary (read-your-writes),
+  also through another worker's router, while other clients stay on the
+  replica; a POST that writes nothing pins nobody, and a forged pin past
+  the lag window is ignored;
+* a session that has flushed keeps reading from the primary;
+* a replica beyond the lag tolerance, or unreachable, is skipped.
+
+    cd server
+    python scripts/check_replica_routing.py
+
+Against real PostgreSQL replicas, set DB_REPLICA_URLS and watch the
+"replicas" section of /ready and db_read_sessions_total instead.
+"""
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+EXAM_DATE = "2025-01-01T09:00:00"
+
+
+def seed(session) -> None:
+    from app.api.classes.models import Class
+    from app.api.exams.models import Exam
+    from app.api.roles.models import Role
+    from app.api.users.models import User
+
+    for role_id, name in enumerate(["student", "supervisor", "admin"], 1):
+        session.add(Role(id=role_id, name=name))
+    session.add(User(id=1, email="admin@example.com", full_name="Admin", role_id=3))
+    session.add(Class(id=1, name="Class 1", studying_program="CS", year=1))
+    for i in range(2):
+        session.add(Exam(name=f"Exam {i}", exam_date=datetime(2025, 1, 1), class_id=1))
+    session.commit()
+
+
+def main() -> int:
+    import time
+
+    from fastapi import FastAPI, Request
+    from fastapi.testclient import TestClient
+    from sqlalchemy import create_engine, func, select
+    from sqlalchemy.orm import sessionmaker
+
+    from app.api.auth.principals import Principal
+    from app.api.auth.services import get_current_admin, get_current_supervisor
+    from app.api.exams import routes as exam_routes
+    from app.api.exams.models import Exam
+    from app.api.roles import models as _role_models  # noqa: F401, mapper registry
+    from app.core.database import Base, get_db
+    from app.core.replicas import (
+        PRIMARY_UNTIL_HEADER,
+        ReplicaRouter,
+        create_replica,
+        get_read_db_session,
+        track_writes,
+    )
+
+    directory = tempfile.mkdtemp()
+    primary_path = os.path.join(directory, "primary.db")
+    replica_path = os.path.join(directory, "replica.db")
+
+    primary = create_engine(f"sqlite:///{primary_path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(primary)
+    Session = sessionmaker(bind=primary, autoflush=False)
+    with Session() as session:
+        seed(session)
+    shutil.copyfile(primary_path, replica_path)
+    with Session() as session:
+        session.add(Exam(name="Not replicated yet", exam_date=datetime(2025, 1, 2), class_id=1))
+        session.commit()
+
+    def get_test_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def build_worker(router: ReplicaRouter) -> FastAPI:
+        """One app per router, standing in for separate worker processes"""
+        def get_test_read_db(request: Request):
+            db = router.session(router.primary_until(request))
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app = FastAPI()
+        app.include_router(exam_routes.router)
+        admin = Principal(id=1, email="admin@example.com", role_id=3)
+        app.dependency_overrides[get_db] = get_test_db
+        app.dependency_overrides[get_read_db_session] = get_test_read_db
+        app.dependency_overrides[get_current_supervisor] = lambda: admin
+        app.dependency_overrides[get_current_admin] = lambda: admin
+
+        @app.middleware("http")
+        async def pin_writers_to_primary(request: Request, call_next):
+            # As in app.main, against this router
+            with track_writes() as writes:
+                response = await call_next(request)
+            if writes.wrote and response.status_code < 400:
+                router.pin(response)
+            return response
+
+        @app.post("/no-write")
+        def no_write():
+            # Stands in for the detection and login POSTs
+            return {}
+
+        return app
+
+    router = ReplicaRouter(primary, [create_replica("replica0", f"sqlite:///{replica_path}")], max_lag_seconds=5)
+    router.check()
+    other_router = ReplicaRouter(primary, [create_replica("replica0", f"sqlite:///{replica_path}")], max_lag_seconds=5)
+    other_router.check()
+    app, other_worker = build_worker(router), build_worker(other_router)
+
+    # Each TestClient keeps its own cookies, like separate browsers
+    alice, bob = TestClient(app), TestClient(app)
+
+    def exams_seen(client, headers=None) -> int:
+        return len(client.get("/exams/", headers=headers).json())
+
+    def primary_exams() -> int:
+        with Session() as session:
+            return session.scalar(select(func.count(Exam.id)))
+
+    results = []
+
+    def check(name: str, ok: bool) -> None:
+        results.append(ok)
+        print(f"{'ok  ' if ok else 'FAIL'}  {name}")
+
+    check("reads go to the replica", exams_seen(alice) == 2)
+    alice.post("/no-write")
+    check("a POST that writes nothing does not pin", exams_seen(alice) == 2)
+    response = alice.post("/exams/", json={"name": "Created", "exam_date": EXAM_DATE, "class_id": 1})
+    check("writes go to the primary", response.status_code == 201 and primary_exams() == 4)
+    check("the writer then reads from the primary", exams_seen(alice) == 4)
+    other_alice = TestClient(other_worker, cookies=alice.cookies)
+    check("so it does through another worker", exams_seen(other_alice) == 4)
+    pin = {PRIMARY_UNTIL_HEADER: response.headers[PRIMARY_UNTIL_HEADER]}
+    check("a client without cookies can echo the header", exams_seen(TestClient(other_worker), pin) == 4)
+    check("other clients stay on the replica", exams_seen(bob) == 2)
+    forged = {PRIMARY_UNTIL_HEADER: str(time.time() + 3600)}
+    check("a pin past the lag window is ignored", exams_seen(bob, forged) == 2)
+
+    with router.session() as session:
+        session.add(Exam(name="Flushed", exam_date=datetime(2025, 1, 3), class_id=1))
+        session.flush()
+        check(
+            "a session reads from the primary once it has flushed",
+            session.scalar(select(func.count(Exam.id))) == 5
+        )
+        session.rollback()
+
+    router.replicas[0].lag_seconds = 60
+    check("a lagging replica is skipped", exams_seen(bob) == 4)
+
+    missing = create_replica("replica1", f"sqlite:///{os.path.join(directory, 'missing', 'replica.db')}")
+    router.replicas = [missing]
+    router.check()
+    check("an unreachable replica is skipped", missing.lag_seconds is None and exams_seen(bob) == 4)
+
+    shutil.rmtree(directory)
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""Load test the read endpoints on the sync (psycopg2) and async (asyncpg) paths.
+
+Mounts the real users, roles, classes and exams routers in-process and
+fires `--requests` GETs per concurrency level at a mix of list and detail
+endpoints, once with the sync session (handlers on the 40-thread pool)
+and once with the async one (run_sync on the event loop). Both engines
+take their pool size from DB_POOL_SIZE and DB_MAX_OVERFLOW. Reports
+requests/sec, latency percentiles and time spent waiting for a pooled
+connection.
+
+Needs the PostgreSQL database from .env with some data in it; it only
+reads. Authentication is bypassed with an admin principal.
+
+    cd server
+    python scripts/load_test_db.py --requests 2000 --concurrency 10 50 200 --output load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PATHS = [
+    "/roles/",
+    "/users/?limit=50",
+    "/classes/?limit=20",
+    "/exams/?limit=50",
+    "/users/1",
+    "/exams/1",
+]
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    values = sorted(samples_ms) or [0.0]
+
+    def percentile(p: float) -> float:
+        return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+    return {
+        "count": len(samples_ms),
+        "mean_ms": statistics.fmean(values),
+        "p50_ms": percentile(50),
+        "p95_ms": percentile(95),
+        "p99_ms": percentile(99),
+        "max_ms": values[-1],
+    }
+
+
+class PoolWaits:
+    """Times every connection checkout, including the wait for a free slot"""
+
+    def __init__(self, pool):
+        self.samples_ms: List[float] = []
+        self._lock = threading.Lock()
+        do_get = pool._do_get
+
+        def timed_do_get():
+            started = time.perf_counter()
+            try:
+                return do_get()
+            finally:
+                with self._lock:
+                    self.samples_ms.append((time.perf_counter() - started) * 1000)
+
+        pool._do_get = timed_do_get
+
+    def reset(self) -> None:
+        with self._lock:
+            self.samples_ms = []
+
+
+def build_app(mode: str):
+    from fastapi import FastAPI
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from app.api.auth.principals import Principal
+    from app.api.auth.services import get_current_admin, get_current_supervisor
+    from app.api.classes import routes as class_routes
+    from app.api.exams import routes as exam_routes
+    from app.api.roles import routes as role_routes
+    from app.api.users import routes as user_routes
+    from app.core.config import settings
+    from app.core.database import engine, get_db, get_db_session
+    from app.core.replicas import get_read_db_session
+
+    app = FastAPI()
+    for routes in (user_routes, role_routes, class_routes, exam_routes):
+        app.include_router(routes.router)
+    admin = Principal(id=0, email="load-test@example.com", role_id=3)
+    app.dependency_overrides[get_current_supervisor] = lambda: admin
+    app.dependency_overrides[get_current_admin] = lambda: admin
+
+    if mode == "sync":
+        app.dependency_overrides[get_db_session] = get_db
+        app.dependency_overrides[get_read_db_session] = get_db
+        return app, PoolWaits(engine.pool), None
+
+    async_engine = create_async_engine(
+        settings.ASYNC_DATABASE_URL,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_pre_ping=True,
+    )
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    async def get_test_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app.dependency_overrides[get_db_session] = get_test_async_db
+    app.dependency_overrides[get_read_db_session] = get_test_async_db
+    return app, PoolWaits(async_engine.sync_engine.pool), async_engine
+
+
+async def run_load(app, pool_waits: PoolWaits, requests: int, concurrency: int) -> Dict:
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+        # Warm the pool so connection setup is not part of the numbers
+        await asyncio.gather(*(client.get(PATHS[0]) for _ in range(15)))
+        pool_waits.reset()
+
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies_ms: List[float] = []
+        statuses: Dict[str, int] = {}
+
+        async def fire(i: int) -> None:
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(PATHS[i % len(PATHS)])
+                    outcome = str(response.status_code)
+                except Exception as e:
+                    # No app exception handlers here: a pool timeout
+                    # surfaces as the exception instead of a 503
+                    outcome = type(e).__name__
+                latencies_ms.append((time.perf_counter() - started) * 1000)
+                statuses[outcome] = statuses.get(outcome, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(fire(i) for i in range(requests)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests_per_second": requests / elapsed,
+        "statuses": statuses,
+        "latency": summarize(latencies_ms),
+        "pool_wait": {**summarize(pool_waits.samples_ms), "total_ms": sum(pool_waits.samples_ms)},
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--modes", nargs="+", choices=["sync", "async"], default=["sync", "async"])
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    report = {
+        "started_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "paths": PATHS,
+        "runs": {},
+    }
+    for mode in args.modes:
+        app, pool_waits, async_engine = build_app(mode)
+
+        # One event loop per mode: asyncpg connections belong to the loop
+        # that opened them
+        async def run_levels() -> List[Dict]:
+            try:
+                return [
+                    await run_load(app, pool_waits, args.requests, concurrency)
+                    for concurrency in args.concurrency
+                ]
+            finally:
+                if async_engine is not None:
+                    await async_engine.dispose()
+
+        report["runs"][mode] = asyncio.run(run_levels())
+        for result in report["runs"][mode]:
+            print(
+                f"{mode:5} c={result['concurrency']:<4} {result['requests_per_second']:7.1f} req/s  "
+                f"p50 {result['latency']['p50_ms']:7.1f} ms  p99 {result['latency']['p99_ms']:7.1f} ms  "
+                f"pool wait mean {result['pool_wait']['mean_ms']:6.2f} ms  max {result['pool_wait']['max_ms']:7.1f} ms  "
+                f"{result['statuses']}"
+            )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())